@@ -5,7 +5,7 @@ from dotenv import load_dotenv
 # Load .env from the server/ directory (where this file lives)
 load_dotenv(os.path.join(os.path.dirname(__file__), '.env'))
 
-from flask import Flask
+from flask import Flask, Request, current_app
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_bcrypt import Bcrypt
@@ -19,6 +19,17 @@ login_manager = LoginManager()
 bcrypt = Bcrypt()
 migrate = Migrate()
 
+# Endpoints that take whole archives and get MAX_ZIP_CONTENT_LENGTH instead
+ARCHIVE_ENDPOINTS = {'admin.api_zip_upload_resumes'}
+
+
+class ResumeIQRequest(Request):
+    @property
+    def max_content_length(self):
+        if self.endpoint in ARCHIVE_ENDPOINTS:
+            return current_app.config['MAX_ZIP_CONTENT_LENGTH']
+        return super().max_content_length
+
 
 def create_app():
     # Point Flask at the client/ folder for templates and static files
@@ -30,6 +41,7 @@ def create_app():
         template_folder=os.path.join(CLIENT_DIR, 'templates'),
         static_folder=os.path.join(CLIENT_DIR, 'static'),
     )
+    app.request_class = ResumeIQRequest
 
     # ------------------------------------------------------------------
     # Configuration
@@ -41,6 +53,8 @@ def create_app():
     # File uploads — stored inside server/uploads/
     app.config['UPLOAD_FOLDER'] = os.path.join(BASE_DIR, 'uploads')
     app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16 MB
+    # ZIP imports (see zip_ingest.py) are spooled to a temp file by Werkzeug
+    app.config['MAX_ZIP_CONTENT_LENGTH'] = int(os.environ.get('MAX_ZIP_UPLOAD_MB', 1024)) * 1024 * 1024
 
     # Database — SQLite stored inside server/instance/
     db_path = os.path.join(BASE_DIR, 'instance', 'resumeiq.db')
@@ -52,6 +66,10 @@ def create_app():
     # OpenRouter AI scoring — key loaded from .env (never hardcoded)
     app.config['OPENROUTER_API_KEY'] = os.environ.get('OPENROUTER_API_KEY', '')
 
+    # Upload jobs are processed by worker.py; setting this runs that many
+    # worker threads inside the web process instead (single-process dev).
+    app.config['UPLOAD_WORKER_THREADS'] = int(os.environ.get('UPLOAD_WORKER_THREADS', 0))
+
     # Recommended pool settings for SQLite; safe for other engines too.
     app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
         'pool_pre_ping': True,
@@ -114,4 +132,8 @@ def create_app():
             db.session.commit()
             print('[DB] Default admin user created (username=admin, password=password123)')
 
+    if app.config['UPLOAD_WORKER_THREADS'] > 0:
+        from jobs import start_background_workers
+        start_background_workers(app, app.config['UPLOAD_WORKER_THREADS'])
+
     return app
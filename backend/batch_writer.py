@@ -0,0 +1,115 @@
+"""
+Batch Writer
+============
+Persists the rows of a bulk upload in a few round trips instead of three
+per file.  Each resume is queued as plain column dicts; every
+``BULK_COMMIT_CHUNK`` resumes (and on ``close()``) the writer sends
+
+  1. one multi-row ``INSERT INTO resume ... RETURNING id``,
+  2. one multi-row ``INSERT INTO parsed_data`` using those ids,
+  3. one Mongo ``insert_many`` for the ``AtsScore`` documents,
+  4. the ``on_write`` hook, if any (e.g. ``BatchTracker.record_written``),
+  5. one ``COMMIT``,
+
+and then runs the chunk's ``on_commit`` callbacks (e.g. saving the upload
+files), so nothing outside the database happens for rows that never land.
+
+If a chunk fails it is rolled back as a whole and its keys are listed in
+``failed``; earlier chunks stay committed.
+"""
+
+import os
+
+from sqlalchemy import insert
+
+from models import db, Resume, ParsedData
+from mongo_models import AtsScore
+
+BULK_COMMIT_CHUNK = int(os.environ.get("BULK_COMMIT_CHUNK", 100))
+
+
+class BatchWriter:
+    """
+    Collects ``Resume`` / ``ParsedData`` / ``AtsScore`` rows and writes them
+    in chunks.  ``resume_ids`` maps each key to its new ``Resume.id``.
+    ``on_write([(key, resume_id), ...])`` runs inside each chunk's
+    transaction, so whatever it records commits (or rolls back) with the rows.
+    """
+
+    def __init__(self, chunk_size: int = BULK_COMMIT_CHUNK, on_write=None):
+        self.chunk_size = max(1, chunk_size)
+        self.on_write = on_write
+        self.resume_ids = {}
+        self.failed = {}          # key -> error message
+        self._pending = []        # (key, resume, parsed, ats, on_commit)
+
+    def add(self, key, resume: dict, parsed: dict, ats: dict = None, on_commit=None):
+        """
+        Queue one resume.  ``parsed`` (ParsedData columns) and ``ats``
+        (AtsScore fields) get their ``resume_id`` filled in on write;
+        ``on_commit()`` is called once the resume's chunk is committed.
+        """
+        self._pending.append((key, resume, parsed, ats, on_commit))
+        if len(self._pending) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Write and commit every queued resume."""
+        chunk, self._pending = self._pending, []
+        if not chunk:
+            return
+        ids, documents = [], []
+        try:
+            ids = _insert_returning_ids([resume for _, resume, _, _, _ in chunk])
+            db.session.execute(
+                insert(ParsedData),
+                [dict(parsed, resume_id=resume_id) for (_, _, parsed, _, _), resume_id in zip(chunk, ids)],
+            )
+            documents = [AtsScore(resume_id=resume_id, **ats)
+                         for (_, _, _, ats, _), resume_id in zip(chunk, ids) if ats is not None]
+            if documents:
+                AtsScore.objects.insert(documents, load_bulk=False)
+            if self.on_write is not None:
+                self.on_write([(key, resume_id) for (key, _, _, _, _), resume_id in zip(chunk, ids)])
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error writing batch of {len(chunk)} resumes: {e}")
+            if documents:
+                # The rolled-back ids may be reused; drop their score documents
+                try:
+                    AtsScore.objects(resume_id__in=ids).delete()
+                except Exception as cleanup_error:
+                    print(f"Could not remove score documents of resumes {ids}: {cleanup_error}")
+            for key, _, _, _, _ in chunk:
+                self.failed[key] = str(e)
+            return
+        for (key, _, _, _, on_commit), resume_id in zip(chunk, ids):
+            self.resume_ids[key] = resume_id
+            if on_commit is not None:
+                try:
+                    on_commit()
+                except Exception as e:
+                    print(f"Error after committing resume {resume_id}: {e}")
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+
+def _insert_returning_ids(rows: list) -> list:
+    """Multi-row insert of ``Resume`` rows; returns their ids in row order."""
+    if db.session.get_bind().dialect.name == "sqlite":
+        # SQLAlchemy can only keep RETURNING in parameter order on SQLite by
+        # inserting row by row.  SQLite hands out rowids in VALUES order, so
+        # one multi-row insert and a sort give the same ids.
+        return sorted(db.session.scalars(insert(Resume).returning(Resume.id), rows).all())
+    return db.session.scalars(
+        insert(Resume).returning(Resume.id, sort_by_parameter_order=True), rows
+    ).all()
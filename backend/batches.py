@@ -0,0 +1,173 @@
+"""
+Batch Tracking
+==============
+Progress of bulk imports, kept in the ``batch`` / ``batch_item`` tables
+(see ``models.Batch``) so an import that dies part-way — a crashed or
+restarted worker, a request timeout — is not lost.  Every distinct file of
+a batch has a ``BatchItem`` (matched by raw-bytes SHA-256) whose state goes
+
+    pending → done      (its Resume row is committed)
+            → failed    (extraction, parsing or the write failed)
+
+Items are marked ``done`` by ``BatchTracker.record_written``, the
+``BatchWriter`` hook, in the same transaction as their rows, so the state
+never claims more than what was written.  Routes flush every
+``BATCH_CHECKPOINT_EVERY`` files.
+
+A batch is ``running`` while an import is in progress, ``partial`` when
+it ended with items still failed or pending, and ``done`` once every item
+is.  Sending the same files again for the same role or job (same
+``fingerprint``) while their batch is running or partial reopens it:
+``admit`` drops files that are already ``done`` (and whose resume still
+exists) and retries pending and failed ones, and their Resume rows keep the
+original ``batch_id``.  Once a batch is done, the same files start a new
+batch.
+"""
+
+import hashlib
+import os
+import uuid
+from datetime import datetime
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Batch, BatchItem, Resume
+
+BATCH_CHECKPOINT_EVERY = int(os.environ.get("BATCH_CHECKPOINT_EVERY", 20))
+
+
+def role_scope(role: str) -> str:
+    return f"role:{role}"[:150]
+
+
+def job_scope(jd) -> str:
+    return f"job:{jd.id}"
+
+
+def files_fingerprint(uploads) -> str:
+    """Identifies a set of files regardless of order, names or duplicates."""
+    digest = hashlib.sha256()
+    for sha in sorted({upload.sha256 for upload in uploads}):
+        digest.update(sha.encode())
+    return digest.hexdigest()
+
+
+def open_batch(user_id: int, scope: str, fingerprint: str, job_id: int = None) -> "BatchTracker":
+    """
+    Reopen this user's running or partial batch with the same scope and
+    fingerprint, or start a new one.  Done batches are never reopened:
+    sending the same files after every one of them was imported imports
+    them again.
+    """
+    open_key = hashlib.sha256(f"{user_id}\n{scope}\n{fingerprint}".encode()).hexdigest()
+    batch = Batch.query.filter_by(open_key=open_key).first()
+    if batch is None:
+        batch = Batch(batch_key=str(uuid.uuid4())[:8], user_id=user_id, job_id=job_id,
+                      scope=scope, fingerprint=fingerprint, open_key=open_key)
+        db.session.add(batch)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent request opened it first; carry on in that batch
+            db.session.rollback()
+            batch = Batch.query.filter_by(open_key=open_key).one()
+    batch.state = "running"
+    batch.updated_at = datetime.utcnow()
+    db.session.commit()
+    return BatchTracker(batch)
+
+
+class BatchTracker:
+    """
+    Per-item bookkeeping for one ``Batch``.  ``skipped`` counts files left
+    out by ``admit`` (already done, or a duplicate within the batch);
+    ``unreadable`` counts files that failed before they could be admitted
+    (e.g. corrupt ZIP members) and, like failed items, keeps the batch open.
+    """
+
+    def __init__(self, batch: Batch):
+        self.batch = batch
+        self.skipped = 0
+        self.unreadable = 0
+        self._item_ids = {}   # sha256 -> BatchItem.id
+        self._done = set()    # sha256 of done items
+        # A done item whose resume has since been deleted is imported again
+        rows = db.session.query(BatchItem.id, BatchItem.file_sha256, BatchItem.state, Resume.id) \
+            .outerjoin(Resume, Resume.id == BatchItem.resume_id).filter(BatchItem.batch_id == batch.id)
+        for item_id, sha, state, resume_id in rows:
+            self._item_ids[sha] = item_id
+            if state == "done" and resume_id is not None:
+                self._done.add(sha)
+
+    @property
+    def key(self) -> str:
+        """The ``Resume.batch_id`` value of this batch."""
+        return self.batch.batch_key
+
+    def admit(self, uploads: list) -> list:
+        """
+        Register ``uploads`` as items (committed) and return the ones still
+        to import, in order: one per distinct file not yet ``done``.
+        """
+        todo, admitted, new = [], set(), []
+        for upload in uploads:
+            if upload.sha256 in self._done or upload.sha256 in admitted:
+                self.skipped += 1
+                continue
+            admitted.add(upload.sha256)
+            todo.append(upload)
+            if upload.sha256 not in self._item_ids:
+                new.append(BatchItem(batch_id=self.batch.id, filename=upload.filename[:255],
+                                     file_sha256=upload.sha256))
+        if new:
+            db.session.add_all(new)
+            self.batch.total += len(new)
+            self.batch.updated_at = datetime.utcnow()
+            db.session.commit()
+            self._item_ids.update((item.file_sha256, item.id) for item in new)
+        return todo
+
+    def record_written(self, written: list):
+        """``BatchWriter`` hook: mark ``[(upload, resume_id), ...]`` done in the writer's transaction."""
+        now = datetime.utcnow()
+        db.session.execute(update(BatchItem), [
+            {"id": self._item_ids[upload.sha256], "state": "done", "resume_id": resume_id,
+             "error": None, "updated_at": now}
+            for upload, resume_id in written
+        ])
+
+    def settle(self, items: list, writer):
+        """
+        After ``writer.flush()``: mark the ``BulkItem``s that got no Resume
+        row as failed, and commit.
+        """
+        now = datetime.utcnow()
+        failed = []
+        for item in items:
+            sha = item.upload.sha256
+            if item.upload in writer.resume_ids:
+                self._done.add(sha)
+                continue
+            error = item.error or writer.failed.get(item.upload) or "not imported"
+            failed.append({"id": self._item_ids[sha], "state": "failed", "error": error, "updated_at": now})
+        if failed:
+            db.session.execute(update(BatchItem), failed)
+        self.batch.updated_at = now
+        db.session.commit()
+
+    def finish(self):
+        """
+        Every admitted file has been attempted.  The batch is closed only if
+        every item is ``done``; otherwise it stays open as ``partial``, so
+        sending the same files again retries just the ones that failed.
+        """
+        unfinished = BatchItem.query.filter(BatchItem.batch_id == self.batch.id,
+                                            BatchItem.state != "done").count()
+        if unfinished or self.unreadable:
+            self.batch.state = "partial"
+        else:
+            self.batch.state = "done"
+            self.batch.open_key = None
+        self.batch.updated_at = datetime.utcnow()
+        db.session.commit()
@@ -0,0 +1,175 @@
+"""
+Bulk Ingest
+===========
+Front half of the recruiter batch uploads (``admin.upload``,
+``admin.job_applicants`` and ``api_bulk_upload_resumes``): turns a batch of
+in-memory uploads into scored items, one per upload and in the same order,
+before the route writes anything to the databases.
+
+  • extraction + ``parse_resume`` – fanned out across the sandboxed worker
+    processes (``ingest_uploads``), one job per distinct file;
+  • scoring – shared score cache first, then one vectorised batch-scorer
+    call for the misses (``cached_batch_scores``), in the parent.
+
+Failed files stay in the list with ``ok=False`` and ``error`` set to
+"extraction failed (...)" or "parsing failed (...)".
+
+``store_applicants`` turns scored items into job applicants (Resume,
+ParsedData and AtsScore rows queued on a ``BatchWriter``) or role-scored
+resumes (Resume and ParsedData), and the per-file result records the bulk
+endpoints return.  Every bulk route stores its rows through it.
+
+``iter_ingest_batches`` does the same ingestion in slices, so a streaming response
+can report (and the route commit) the first files after about one file's
+processing time instead of after the whole batch.
+"""
+
+import json
+from collections import namedtuple
+
+from score_cache import cached_batch_scores, text_fingerprint
+from utils.analyzer import analyze_skill_gap, generate_ai_tips
+from utils.uploads import ingest_uploads, persist_upload, upload_name
+
+BulkItem = namedtuple("BulkItem", [
+    "upload", "ok", "error", "text", "parsed", "content_hash", "score", "breakdown", "feedback",
+])
+
+
+def ingest_batch(uploads: list, target: str, batch_scorer) -> list:
+    """
+    Extract, parse and score ``uploads`` against ``target`` (a score-cache
+    target, see ``role_target`` / ``jd_target``) using
+    ``batch_scorer(parsed_list)`` for uncached resumes.
+    Returns one ``BulkItem`` per upload, in order.
+    """
+    ingested = ingest_uploads(uploads)
+    good = [i for i, result in enumerate(ingested) if result.ok]
+    hashes = [text_fingerprint(ingested[i].text) for i in good]
+    scores = cached_batch_scores([ingested[i].parsed for i in good], hashes, target, batch_scorer)
+
+    items = [BulkItem(upload, False, result.error, "", None, None, 0, {}, [])
+             for upload, result in zip(uploads, ingested)]
+    for i, content_hash, (score, breakdown, feedback) in zip(good, hashes, scores):
+        items[i] = BulkItem(uploads[i], True, None, ingested[i].text, ingested[i].parsed,
+                            content_hash, score, breakdown, feedback)
+    return items
+
+
+def iter_ingest_batches(uploads: list, target: str, batch_scorer, size: int):
+    """
+    ``ingest_batch`` over consecutive slices of ``size`` uploads, yielding
+    ``(offset, items)`` per slice as soon as it is scored.
+    """
+    size = max(1, size)
+    for offset in range(0, len(uploads), size):
+        yield offset, ingest_batch(uploads[offset:offset + size], target, batch_scorer)
+
+
+def store_applicants(writer, jd, keyed_items, user_id: int, batch_id: str, upload_folder: str,
+                     role: str = None) -> list:
+    """
+    Add each ``(key, BulkItem)`` through ``writer`` — as an applicant of
+    ``jd`` (a JobDescription), or, with ``jd=None``, as a resume scored for
+    ``role`` — flush it, and return ``(key, result)`` per item with
+    ``result`` = ``{candidateName, score, status, error}``.
+    """
+    staged = [(key, _stage_applicant(writer, key, jd, role, item, user_id, batch_id, upload_folder))
+              for key, item in keyed_items]
+    writer.flush()
+    results = []
+    for key, result in staged:
+        if key in writer.failed:
+            result = {"candidateName": result["candidateName"], "score": 0,
+                      "status": "Failed (Database error)", "error": True}
+        results.append((key, result))
+    return results
+
+
+def _stage_applicant(writer, key, jd, role, item, user_id, batch_id, upload_folder):
+    """Queue one ``BulkItem`` on ``writer`` under ``key``; returns its result record."""
+    if not item.ok:
+        print(f"Error processing {item.upload.filename}: {item.error}")
+        status = "Failed (Extraction error)" if item.error.startswith("extraction") else "Failed (Parsing error)"
+        return {"candidateName": item.upload.filename, "score": 0, "status": status, "error": True}
+
+    upload, text, parsed_data = item.upload, item.text, item.parsed
+    score, breakdown, feedback = item.score, item.breakdown, item.feedback
+    filename, file_size = upload.filename, upload.size
+    role = jd.title if jd is not None else role
+    try:
+        missing_skills = analyze_skill_gap(parsed_data['skills'], role)
+
+        if jd is not None:
+            suggestions = {
+                'weaknesses': feedback,
+                'missing_keywords': missing_skills
+            }
+        else:
+            suggestions = {
+                'strengths': ([f"Found {len(parsed_data['skills'])} relevant skills."]
+                              if parsed_data['skills'] else []),
+                'weaknesses': feedback,
+                'missing_keywords': missing_skills,
+                'improvements': generate_ai_tips(parsed_data),
+            }
+        
+        analysis_json = json.dumps({
+            'score': score,
+            'breakdown': breakdown,
+            'details': parsed_data,
+            'suggestions': suggestions,
+            'role': role,
+        })
+
+        # The file is written once its row is committed (on_commit below)
+        safe_name = upload_name(upload)
+        resume = dict(
+            user_id=user_id,
+            filename=filename,
+            filepath=safe_name,
+            file_size=file_size,
+            score=score,
+            role_applied=role,
+            analysis_data=analysis_json,
+            content_hash=item.content_hash,
+            batch_id=batch_id
+        )
+        ats = None
+        if jd is not None:
+            resume.update(job_id=jd.id, applicant_status='New')
+            ats = dict(
+                candidate_id=str(user_id),
+                job_id=str(jd.id),
+                resume_text=text[:10000],
+                score=score,
+                breakdown=breakdown,
+                missing_skills=missing_skills,
+                red_flags=feedback,
+                status='New'
+            )
+        writer.add(
+            key,
+            resume=resume,
+            parsed=dict(
+                name=parsed_data.get('name') or 'Unknown Candidate',
+                email=parsed_data.get('email'),
+                phone=parsed_data.get('phone'),
+                skills=json.dumps(parsed_data.get('skills', [])),
+                experience=json.dumps(parsed_data.get('experience', [])),
+                education=json.dumps(parsed_data.get('education', [])),
+                raw_text=text[:10000],
+            ),
+            ats=ats,
+            on_commit=lambda: persist_upload(upload, upload_folder, name=safe_name),
+        )
+    except Exception as e:
+        print(f"Error processing {filename}: {e}")
+        return {"candidateName": filename, "score": 0, "status": "Failed (Parsing error)", "error": True}
+
+    return {
+        "candidateName": parsed_data.get('name') or filename,
+        "score": score,
+        "status": "New",
+        "error": False
+    }
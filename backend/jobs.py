@@ -0,0 +1,458 @@
+"""
+Upload Jobs
+===========
+Candidate uploads are analysed off the request path.  ``/upload`` stores the
+raw file in the ``upload_job`` table (see ``models.UploadJob``) and returns
+202 straight away; a worker (``python backend/worker.py``) claims queued
+jobs and walks each one through
+
+    queued → extracting → scoring → enriching → done   (or failed)
+
+while the client polls ``/jobs/<id>``.  The queue lives in the app's own
+SQLite database, so a job survives web or worker restarts: a job whose
+worker died mid-flight is put back in the queue once it has not moved for
+``JOB_STALE_AFTER`` seconds (up to ``JOB_MAX_ATTEMPTS`` tries).
+
+Results arrive in two phases.  The rule-based score, breakdown and tips are
+stored (Resume, ParsedData, AtsScore) and published on the job as soon as
+scoring finishes, with ``suggestions.ai_pending`` set; the job then enters
+``enriching``, and the OpenRouter narrative and tips are merged into
+``Resume.analysis_data`` when they arrive.  The result page picks them up
+from ``/report/<id>/ai``.
+
+Claiming is a conditional ``UPDATE ... WHERE state = 'queued'`` so any
+number of worker processes (or in-process threads, see
+``start_background_workers``) can share one queue.  Identical uploads are
+processed once: a repeat of an in-flight job is folded into it at enqueue
+time, and identical resumes in different jobs are scored and enriched under
+a ``single_flight`` lock so later ones reuse the first one's cached result.
+"""
+
+import json
+import os
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+
+from models import db, Resume, ParsedData, UploadJob
+from mongo_models import AtsScore
+from single_flight import single_flight
+from score_cache import (SCORE_CACHE_SWEEP_INTERVAL, lookup_scores, role_target,
+                         store_scores, sweep_score_cache, text_fingerprint, update_scores)
+from utils.analyzer import analyze_skill_gap
+from utils.extractor import ExtractionError
+from utils.scorer import calculate_ats_score, score_all_roles
+from utils.uploads import UploadedResume, ingest_uploads, persist_upload, upload_name
+
+JOB_POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", 0.2))
+JOB_STALE_AFTER = float(os.environ.get("JOB_STALE_AFTER", 300))
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", 3))
+
+ACTIVE_STATES = ("extracting", "scoring", "enriching")
+FINISHED_STATES = ("done", "failed")
+
+
+# ---------------------------------------------------------------------------
+# Queue
+# ---------------------------------------------------------------------------
+
+def enqueue_upload(user_id: int, upload: UploadedResume, role: str) -> UploadJob:
+    """
+    Store ``upload`` as a queued job and return it (committed).  If the same
+    user already has this file queued or in progress for ``role`` (a double
+    click, a client retry), that job is returned instead.
+    """
+    in_flight = (
+        UploadJob.query
+        .filter(UploadJob.user_id == user_id,
+                UploadJob.file_sha256 == upload.sha256,
+                UploadJob.role == role,
+                UploadJob.state.notin_(FINISHED_STATES))
+        .order_by(UploadJob.id.desc())
+        .first()
+    )
+    if in_flight is not None:
+        return in_flight
+
+    job = UploadJob(
+        user_id=user_id,
+        role=role,
+        filename=upload.filename,
+        file_sha256=upload.sha256,
+        payload=upload.data,
+        state="queued",
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def set_state(job: UploadJob, state: str, **fields):
+    """Move ``job`` to ``state`` (plus any column updates) and commit."""
+    job.state = state
+    job.updated_at = datetime.utcnow()
+    for name, value in fields.items():
+        setattr(job, name, value)
+    db.session.commit()
+
+
+def claim_next_job():
+    """
+    Atomically take the oldest queued job, moving it to ``extracting``.
+    Returns the job, or None when the queue is empty.
+    """
+    while True:
+        row = (
+            db.session.query(UploadJob.id)
+            .filter_by(state="queued")
+            .order_by(UploadJob.id)
+            .first()
+        )
+        if row is None:
+            return None
+        claimed = (
+            UploadJob.query
+            .filter_by(id=row.id, state="queued")
+            .update({
+                "state": "extracting",
+                "attempts": UploadJob.attempts + 1,
+                "updated_at": datetime.utcnow(),
+            }, synchronize_session=False)
+        )
+        db.session.commit()
+        if claimed:
+            return db.session.get(UploadJob, row.id)
+        # Another worker won the race for this row; try the next one.
+
+
+def requeue_stale_jobs(stale_after: float = JOB_STALE_AFTER) -> int:
+    """
+    Return jobs stuck in an active state (their worker died) to the queue,
+    or fail them once they have used up ``JOB_MAX_ATTEMPTS``.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_after)
+    stale = (
+        UploadJob.query
+        .filter(UploadJob.state.in_(ACTIVE_STATES), UploadJob.updated_at < cutoff)
+        .all()
+    )
+    for job in stale:
+        job.updated_at = datetime.utcnow()
+        if job.resume_id is not None:
+            _finish_without_ai(job)
+        elif job.attempts >= JOB_MAX_ATTEMPTS:
+            job.state = "failed"
+            job.error = "Processing did not finish; please upload the resume again."
+            job.payload = None
+        else:
+            job.state = "queued"
+    if stale:
+        db.session.commit()
+    return len(stale)
+
+
+def job_status(job: UploadJob) -> dict:
+    """JSON body for ``/jobs/<id>``."""
+    status = {
+        "job_id": job.id,
+        "state": job.state,
+        "filename": job.filename,
+        "role": job.role,
+        "resume_id": job.resume_id,
+    }
+    if job.result:                       # set once scoring has finished
+        status["result"] = json.loads(job.result)
+    if job.state == "failed":
+        status["error"] = job.error
+    return status
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+def process_job(job: UploadJob, config: dict):
+    """Run one claimed job to ``done`` or ``failed``."""
+    try:
+        _run_pipeline(job, config)
+    except ExtractionError as e:
+        db.session.rollback()
+        set_state(job, "failed", error=f"Could not read this resume: {e}", payload=None)
+    except Exception as e:
+        db.session.rollback()
+        traceback.print_exc()
+        if job.resume_id is not None:
+            _finish_without_ai(job)
+            db.session.commit()
+        else:
+            set_state(job, "failed", error=str(e), payload=None)
+
+
+def _finish_without_ai(job: UploadJob):
+    """
+    Close out a job whose rule-based result is already stored but whose AI
+    enrichment never finished: clear ``ai_pending`` so clients stop waiting.
+    """
+    resume = db.session.get(Resume, job.resume_id)
+    if resume is not None and resume.analysis_data:
+        analysis = json.loads(resume.analysis_data)
+        analysis.setdefault('suggestions', {})['ai_pending'] = False
+        resume.analysis_data = json.dumps(analysis)
+        job.result = json.dumps(_response(analysis, resume.id))
+    job.state = "done"
+    job.updated_at = datetime.utcnow()
+
+
+def _run_pipeline(job: UploadJob, config: dict):
+    upload = UploadedResume(job.filename, job.payload, job.file_sha256)
+    target_role = job.role
+
+    # --- extracting: text + parse (skipped for byte-identical re-uploads) ---
+    ingested = ingest_uploads([upload])[0]
+    if not ingested.ok:
+        raise ExtractionError(ingested.error)
+    text = ingested.text
+
+    # --- scoring: shared score cache first, rule-based scorer on a miss ---
+    # Identical concurrent uploads (double clicks, retries, the same resume
+    # from several accounts) are scored and enriched once: the rest wait
+    # here and then find the first one's result in the score cache.
+    set_state(job, "scoring")
+    content_hash = text_fingerprint(text)
+    target = role_target(target_role)
+    with single_flight(f"{target}:{content_hash}"):
+        _score_and_enrich(job, config, upload, ingested, content_hash, target)
+
+
+def _score_and_enrich(job, config, upload, ingested, content_hash, target):
+    target_role = job.role
+    text = ingested.text
+    parsed_data = ingested.parsed
+    cached = lookup_scores([content_hash], target).get(content_hash)
+    analysis, feedback, missing_skills = _rule_based_analysis(parsed_data, target_role, cached)
+    if cached is None:
+        store_scores(content_hash, target, {
+            'score': analysis['score'], 'breakdown': analysis['breakdown'], 'feedback': feedback,
+        })
+
+    # Fully cached (scored and enriched for any uploader): no LLM call.
+    fully_cached = cached is not None and bool(cached.get('ai'))
+    if fully_cached:
+        _apply_ai_feedback(analysis, cached['ai'])
+
+    if cached is not None:
+        # Same user, same resume, same role, current scores: refresh the
+        # stored report instead of adding a duplicate.
+        own_resume = Resume.query.filter_by(
+            user_id=job.user_id,
+            role_applied=target_role,
+            content_hash=content_hash,
+        ).order_by(Resume.created_at.desc()).first()
+        if own_resume is not None and own_resume.analysis_data:
+            if not fully_cached:
+                stored = json.loads(own_resume.analysis_data).get('suggestions', {})
+                _apply_ai_feedback(analysis, {
+                    'narrative': stored.get('ai_narrative', ''),
+                    'tips': stored.get('improvements', []),
+                    'ai_powered': stored.get('ai_powered', False),
+                })
+            own_resume.score = analysis['score']
+            own_resume.analysis_data = json.dumps(analysis)
+            set_state(job, "done", result=json.dumps(_response(analysis, own_resume.id, cached=True)),
+                      resume_id=own_resume.id, payload=None)
+            return
+
+    safe_name = upload_name(upload)   # written once the row is committed
+    resume_entry = Resume(
+        user_id=job.user_id,
+        filename=job.filename,
+        filepath=safe_name,          # relative path inside uploads/
+        file_size=upload.size,
+        score=analysis['score'],
+        role_applied=target_role,
+        analysis_data=json.dumps(analysis),
+        content_hash=content_hash,   # store for future deduplication
+    )
+    db.session.add(resume_entry)
+    db.session.flush()               # get resume_entry.id before committing
+
+    ats_score = AtsScore(
+        candidate_id=str(job.user_id),
+        resume_id=resume_entry.id,
+        resume_text=text[:10000],
+        score=analysis['score'],
+        breakdown=analysis['breakdown'],
+        missing_skills=missing_skills,
+        red_flags=feedback,
+        status="New"
+    )
+    ats_score.save()
+
+    parsed_entry = ParsedData(
+        resume_id=resume_entry.id,
+        name=parsed_data.get('name'),
+        email=parsed_data.get('email'),
+        phone=parsed_data.get('phone'),
+        skills=json.dumps(parsed_data.get('skills', [])),
+        experience=json.dumps(parsed_data.get('experience', [])),
+        education=json.dumps(parsed_data.get('education', [])),
+        raw_text=text[:10000],       # cap to avoid huge text blobs
+    )
+    db.session.add(parsed_entry)
+
+    if fully_cached:
+        set_state(job, "done", result=json.dumps(_response(analysis, resume_entry.id, cached=True)),
+                  resume_id=resume_entry.id, payload=None)
+    else:
+        # The client can show this result now; the AI narrative follows.
+        set_state(job, "enriching", result=json.dumps(_response(analysis, resume_entry.id)),
+                  resume_id=resume_entry.id, payload=None)
+    # Committed: a failure above leaves no file behind without its row
+    persist_upload(upload, config['UPLOAD_FOLDER'], name=safe_name)
+    if fully_cached:
+        return
+
+    # --- enriching: AI narrative + tips, merged into analysis_data ---
+    from utils.ai_scorer import get_ai_feedback
+    ai_result = get_ai_feedback(
+        resume_text=parsed_data.get('text', ''),
+        target_role=target_role,
+        score=analysis['score'],
+        breakdown=analysis['breakdown'],
+        missing_skills=missing_skills,
+        api_key=config.get('OPENROUTER_API_KEY', ''),
+    )
+    ai = {
+        'narrative': ai_result.get('narrative', ''),
+        'tips': ai_result.get('tips') or [],
+        'ai_powered': ai_result.get('ai_powered', False),
+    }
+    _apply_ai_feedback(analysis, ai)
+    if ai['ai_powered']:
+        # Only real model output is shared; fallbacks are retried next time.
+        update_scores(content_hash, target, ai=ai)
+
+    resume_entry.analysis_data = json.dumps(analysis)
+    set_state(job, "done", result=json.dumps(_response(analysis, resume_entry.id)))
+
+
+def _apply_ai_feedback(analysis: dict, ai: dict):
+    suggestions = analysis['suggestions']
+    # Use AI tips when available, keep the rule-based tips otherwise
+    if ai.get('ai_powered') and ai.get('tips'):
+        suggestions['improvements'] = ai['tips']
+    suggestions['ai_narrative'] = ai.get('narrative', '')
+    suggestions['ai_powered'] = ai.get('ai_powered', False)
+    suggestions['ai_pending'] = False
+
+
+def _rule_based_analysis(parsed_data: dict, target_role: str, cached: dict = None):
+    """
+    Score ``parsed_data`` for ``target_role`` without any network calls,
+    reusing the score from a ``cached`` score-cache entry if given.
+    Returns ``(analysis, feedback, missing_skills)``; ``analysis`` is the
+    ``analysis_data`` blob with rule-based tips and ``ai_pending`` set.
+    """
+    from utils.analyzer import generate_ai_tips
+
+    if cached is not None:
+        score, breakdown, feedback = cached['score'], cached['breakdown'], cached['feedback']
+    else:
+        score, breakdown, feedback = calculate_ats_score(parsed_data, target_role)
+    missing_skills = analyze_skill_gap(parsed_data['skills'], target_role)
+
+    # Same parse scored against every role → ranked best-fit suggestions
+    best_fit_roles = [{'role': role, 'score': role_score}
+                      for role, role_score in score_all_roles(parsed_data)[:3]]
+
+    suggestions = {
+        'strengths': ([f"Found {len(parsed_data['skills'])} relevant skills."]
+                      if parsed_data['skills'] else []),
+        'weaknesses': feedback,
+        'missing_keywords': missing_skills,
+        'improvements': generate_ai_tips(parsed_data),
+        'ai_narrative': '',
+        'ai_powered': False,
+        'ai_pending': True,
+    }
+    if score > 80:
+        suggestions['strengths'].append('Great ATS score!')
+
+    analysis = {
+        'score': score,
+        'breakdown': breakdown,
+        'details': parsed_data,
+        'suggestions': suggestions,
+        'role': target_role,
+        'best_fit_roles': best_fit_roles,
+    }
+    return analysis, feedback, missing_skills
+
+
+def _response(analysis: dict, resume_id: int, cached: bool = False) -> dict:
+    return dict(analysis, cached=cached, resume_id=resume_id)
+
+
+def ai_feedback_status(resume: Resume) -> dict:
+    """JSON body for the AI follow-up endpoint of a stored resume."""
+    suggestions = json.loads(resume.analysis_data or '{}').get('suggestions', {})
+    return {
+        'resume_id': resume.id,
+        'pending': suggestions.get('ai_pending', False),
+        'ai_powered': suggestions.get('ai_powered', False),
+        'ai_narrative': suggestions.get('ai_narrative', ''),
+        'improvements': suggestions.get('improvements', []),
+        'weaknesses': suggestions.get('weaknesses', []),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Worker loop
+# ---------------------------------------------------------------------------
+
+def run_worker(app, poll_interval: float = JOB_POLL_INTERVAL, once: bool = False,
+               stop: threading.Event = None):
+    """
+    Process jobs until ``stop`` is set (or, with ``once``, until the queue
+    is empty).  Sleeps ``poll_interval`` seconds whenever the queue is idle.
+    Stale jobs and outdated score-cache entries are swept periodically.
+    """
+    stop = stop or threading.Event()
+    last_sweep = last_cache_sweep = float("-inf")
+    while not stop.is_set():
+        with app.app_context():
+            try:
+                if time.monotonic() - last_sweep > min(JOB_STALE_AFTER, 60):
+                    requeue_stale_jobs()
+                    last_sweep = time.monotonic()
+                if time.monotonic() - last_cache_sweep > SCORE_CACHE_SWEEP_INTERVAL:
+                    sweep_score_cache()
+                    last_cache_sweep = time.monotonic()
+                job = claim_next_job()
+                if job is not None:
+                    process_job(job, app.config)
+            except Exception:
+                db.session.rollback()
+                traceback.print_exc()
+                job = None
+            finally:
+                db.session.remove()
+        if job is None:
+            if once:
+                return
+            stop.wait(poll_interval)
+
+
+def start_background_workers(app, count: int) -> threading.Event:
+    """
+    Run ``count`` worker loops as daemon threads inside this process — for
+    single-process development setups.  Set the returned event to stop them.
+    """
+    stop = threading.Event()
+    for index in range(count):
+        threading.Thread(
+            target=run_worker, args=(app,), kwargs={"stop": stop},
+            name=f"upload-job-worker-{index}", daemon=True,
+        ).start()
+    return stop
@@ -132,3 +132,120 @@ class Inquiry(db.Model):
 
     def __repr__(self):
         return f'<Inquiry id={self.id} from={self.email!r} subject={self.subject!r}>'
+
+
+class ScoreCache(db.Model):
+    """
+    Scores shared across uploaders, keyed by the normalised-text hash, the
+    scoring target (role name or JD fingerprint) and the scorer version.
+    Managed by ``score_cache.py``.
+    """
+    __tablename__ = 'score_cache'
+    __table_args__ = (
+        db.UniqueConstraint('content_hash', 'target', 'scorer_version', name='uq_score_cache_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    content_hash = db.Column(db.String(64), nullable=False)
+    target = db.Column(db.String(150), nullable=False)      # "role:<name>" or "jd:<fingerprint>"
+    scorer_version = db.Column(db.String(40), nullable=False, index=True)
+    data = db.Column(db.Text, nullable=False)               # JSON: score, breakdown, feedback[, ai]
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<ScoreCache {self.target} {self.content_hash[:12]} v{self.scorer_version}>'
+
+
+class FlightLock(db.Model):
+    """Cross-process advisory lock row (see ``single_flight.py``)."""
+    __tablename__ = 'flight_lock'
+
+    key = db.Column(db.String(255), primary_key=True)
+    owner = db.Column(db.String(200), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f'<FlightLock {self.key!r} owner={self.owner!r}>'
+
+
+class UploadJob(db.Model):
+    """
+    Durable queue entry for a candidate upload, processed by ``worker.py``.
+
+    State moves queued → extracting → scoring → enriching → done (or failed).
+    The raw file is kept in ``payload`` until the job finishes so a worker
+    restart never loses an upload.
+    """
+    __tablename__ = 'upload_job'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False, index=True)
+    role = db.Column(db.String(100), nullable=False)
+
+    filename = db.Column(db.String(255), nullable=False)
+    file_sha256 = db.Column(db.String(64), nullable=False)
+    payload = db.Column(db.LargeBinary, nullable=True)     # raw upload, cleared when finished
+
+    state = db.Column(db.String(20), default='queued', nullable=False, index=True)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    error = db.Column(db.Text, nullable=True)
+    result = db.Column(db.Text, nullable=True)              # JSON response body once done
+    resume_id = db.Column(db.Integer, db.ForeignKey('resume.id', ondelete='SET NULL'), nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<UploadJob id={self.id} file={self.filename!r} state={self.state}>'
+
+
+class Batch(db.Model):
+    """
+    A bulk import and its progress (see ``batches.py``).  ``batch_key`` is
+    the id stored in ``Resume.batch_id``; ``fingerprint`` identifies the same
+    set of files sent again for the same role or job, so a re-submitted
+    batch that never finished carries on where it stopped.
+    """
+    __tablename__ = 'batch'
+
+    id = db.Column(db.Integer, primary_key=True)
+    batch_key = db.Column(db.String(100), unique=True, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    job_id = db.Column(db.Integer, db.ForeignKey('job_description.id', ondelete='SET NULL'), nullable=True)
+    scope = db.Column(db.String(150), nullable=False)             # "role:<name>" or "job:<id>"
+    fingerprint = db.Column(db.String(64), nullable=False, index=True)
+    # Set (to a hash of user, scope and fingerprint) until every item is done,
+    # then cleared: at most one open batch per set of files
+    open_key = db.Column(db.String(64), unique=True, nullable=True)
+
+    state = db.Column(db.String(20), default='running', nullable=False)   # running, partial, done
+    total = db.Column(db.Integer, default=0, nullable=False)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    items = db.relationship('BatchItem', backref='batch', lazy=True, cascade='all, delete-orphan')
+
+    def __repr__(self):
+        return f'<Batch {self.batch_key} {self.scope!r} state={self.state}>'
+
+
+class BatchItem(db.Model):
+    """One distinct file of a ``Batch``, matched by its raw-bytes SHA-256."""
+    __tablename__ = 'batch_item'
+    __table_args__ = (
+        db.UniqueConstraint('batch_id', 'file_sha256', name='uq_batch_item_file'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    batch_id = db.Column(db.Integer, db.ForeignKey('batch.id', ondelete='CASCADE'), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    file_sha256 = db.Column(db.String(64), nullable=False)
+
+    state = db.Column(db.String(20), default='pending', nullable=False)   # pending, done, failed
+    error = db.Column(db.Text, nullable=True)
+    resume_id = db.Column(db.Integer, db.ForeignKey('resume.id', ondelete='SET NULL'), nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<BatchItem {self.filename!r} state={self.state}>'
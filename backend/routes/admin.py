@@ -1,19 +1,28 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app
+from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app, jsonify, Response, stream_with_context
 from flask_login import login_required, current_user
 from flask_mail import Mail, Message
 from utils.decorators import admin_required, recruiter_required
-from models import db, User, Resume, SMTPConfig, ParsedData, Inquiry, JobDescription
-from utils.constants import get_all_roles, TARGET_ROLES
-from utils.extractor import extract_text
-from utils.scorer import calculate_ats_score, calculate_jd_match_score
-from utils.analyzer import parse_resume, analyze_skill_gap
+from models import db, User, Resume, SMTPConfig, Inquiry, JobDescription
+from utils.constants import get_all_roles, get_target_roles
+from batch_writer import BatchWriter
+from batches import BATCH_CHECKPOINT_EVERY, files_fingerprint, job_scope, open_batch, role_scope
+from bulk_ingest import iter_ingest_batches, store_applicants
+from score_cache import jd_target, role_target
+from zip_ingest import ZipRejected, archive_fingerprint, ingest_zip, open_archive
+from utils.uploads import read_upload
+from utils.scorer import calculate_ats_score_batch, calculate_jd_match_score_batch, compile_job_description
+from utils.extractor import EXTRACT_WORKERS
 from mongo_models import AtsScore
+import itertools
 import uuid
 import os
 import json
 
 admin = Blueprint('admin', __name__, url_prefix='/admin')
 
+# Files per slice when api_bulk_upload_resumes streams its results
+BULK_STREAM_SLICE = int(os.environ.get('BULK_STREAM_SLICE', max(1, EXTRACT_WORKERS)))
+
 @admin.route('/')
 @login_required
 def admin_root():
@@ -52,7 +61,7 @@ def dashboard():
 @login_required
 @recruiter_required
 def candidates():
-    from utils.constants import get_all_roles, TARGET_ROLES
+    from utils.constants import get_all_roles, get_target_roles
     role = request.args.get('role', 'All')
     score_min = request.args.get('score_min', 0, type=int)
     batch_id = request.args.get('batch_id')
@@ -80,7 +89,7 @@ def candidates():
     return render_template('admin_candidates.html', 
                           candidates=candidates, 
                           roles=roles, 
-                          target_roles=TARGET_ROLES,
+                          target_roles=get_target_roles(),
                           selected_role=role,
                           selected_score=score_min,
                           selected_batch=batch_id)
@@ -97,75 +106,33 @@ def upload():
             flash('No files selected', 'error')
             return redirect(url_for('admin.upload'))
             
-        batch_id = str(uuid.uuid4())[:8]
-        processed_count = 0
-        
-        for file in files:
-            if file and file.filename.lower().endswith(('.pdf', '.docx')):
-                import secrets
-                safe_name = secrets.token_hex(8) + '_' + file.filename
-                filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], safe_name)
-                file.save(filepath)
-                file_size = os.path.getsize(filepath)
-                
-                try:
-                    text = extract_text(filepath)
-                    parsed_data = parse_resume(text)
-                    score, breakdown, feedback = calculate_ats_score(parsed_data, target_role)
-                    missing_skills = analyze_skill_gap(parsed_data['skills'], target_role)
-                    
-                    from utils.analyzer import generate_ai_tips
-                    dynamic_tips = generate_ai_tips(parsed_data)
-
-                    suggestions = {
-                        'strengths': ([f"Found {len(parsed_data['skills'])} relevant skills."]
-                                      if parsed_data['skills'] else []),
-                        'weaknesses': feedback,
-                        'missing_keywords': missing_skills,
-                        'improvements': dynamic_tips,
-                    }
-                    
-                    analysis_json = json.dumps({
-                        'score': score,
-                        'breakdown': breakdown,
-                        'details': parsed_data,
-                        'suggestions': suggestions,
-                        'role': target_role,
-                    })
-
-                    resume_entry = Resume(
-                        user_id=current_user.id,
-                        filename=file.filename,
-                        filepath=safe_name,
-                        file_size=file_size,
-                        score=score,
-                        role_applied=target_role,
-                        analysis_data=analysis_json,
-                        batch_id=batch_id
-                    )
-                    db.session.add(resume_entry)
-                    db.session.flush()
-
-                    parsed_entry = ParsedData(
-                        resume_id=resume_entry.id,
-                        name=parsed_data.get('name'),
-                        email=parsed_data.get('email'),
-                        phone=parsed_data.get('phone'),
-                        skills=json.dumps(parsed_data.get('skills', [])),
-                        experience=json.dumps(parsed_data.get('experience', [])),
-                        education=json.dumps(parsed_data.get('education', [])),
-                        raw_text=text[:10000],
-                    )
-                    db.session.add(parsed_entry)
-                    processed_count += 1
-                except Exception as e:
-                    print(f"Error processing {file.filename}: {e}")
-                    
-        db.session.commit()
-        flash(f'Successfully processed {processed_count} resumes in batch {batch_id}', 'success')
+        uploads = [read_upload(file) for file in files
+                   if file and file.filename.lower().endswith(('.pdf', '.docx'))]
+
+        # Progress is tracked per file: sending the same files again resumes
+        # the batch and skips the ones already imported.
+        tracker = open_batch(current_user.id, role_scope(target_role), files_fingerprint(uploads))
+        batch_id = tracker.key
+        writer = BatchWriter(on_write=tracker.record_written)
+
+        # Extraction + parsing fan out over the worker processes; scoring is
+        # one cached, vectorised batch per slice.  DB writes stay in this
+        # thread and commit, with the items' states, after every slice.
+        slices = iter_ingest_batches(tracker.admit(uploads), role_target(target_role),
+                                     lambda batch: calculate_ats_score_batch(batch, target_role),
+                                     BATCH_CHECKPOINT_EVERY)
+        for _, items in slices:
+            store_applicants(writer, None, [(item.upload, item) for item in items], current_user.id,
+                             batch_id, current_app.config['UPLOAD_FOLDER'], role=target_role)
+            tracker.settle(items, writer)
+
+        tracker.finish()
+        processed_count = len(writer.resume_ids)
+        flash(f'Successfully processed {processed_count} resumes in batch {batch_id}'
+              + (f' ({tracker.skipped} already imported)' if tracker.skipped else ''), 'success')
         return redirect(url_for('admin.candidates', batch_id=batch_id))
         
-    return render_template('admin_upload.html', target_roles=TARGET_ROLES)
+    return render_template('admin_upload.html', target_roles=get_target_roles())
 
 @admin.route('/toggle_shortlist/<int:resume_id>')
 @login_required
@@ -360,89 +327,31 @@ def job_applicants(job_id):
             flash('No files selected', 'error')
             return redirect(url_for('admin.job_applicants', job_id=job_id))
             
-        jd_data = {
-            "required_skills": json.loads(jd.required_skills) if jd.required_skills else [],
-            "nice_to_have_skills": json.loads(jd.nice_to_have_skills) if jd.nice_to_have_skills else [],
-            "experience_level": jd.experience_level,
-            "education_requirement": jd.education_requirement
-        }
-
-        processed_count = 0
-        batch_id = str(uuid.uuid4())[:8]
-        
-        for file in files:
-            if file and file.filename.lower().endswith(('.pdf', '.docx')):
-                import secrets
-                safe_name = secrets.token_hex(8) + '_' + file.filename
-                filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], safe_name)
-                file.save(filepath)
-                file_size = os.path.getsize(filepath)
-                
-                try:
-                    text = extract_text(filepath)
-                    parsed_data = parse_resume(text)
-                    
-                    score, breakdown, feedback = calculate_jd_match_score(parsed_data, jd_data)
-                    missing_skills = analyze_skill_gap(parsed_data['skills'], jd.title)
-                    
-                    suggestions = {
-                        'weaknesses': feedback,
-                        'missing_keywords': missing_skills
-                    }
-                    
-                    analysis_json = json.dumps({
-                        'score': score,
-                        'breakdown': breakdown,
-                        'details': parsed_data,
-                        'suggestions': suggestions,
-                        'role': jd.title,
-                    })
-
-                    resume_entry = Resume(
-                        user_id=current_user.id,
-                        filename=file.filename,
-                        filepath=safe_name,
-                        file_size=file_size,
-                        score=score,
-                        role_applied=jd.title,
-                        analysis_data=analysis_json,
-                        job_id=jd.id,
-                        applicant_status='New',
-                        batch_id=batch_id
-                    )
-                    db.session.add(resume_entry)
-                    db.session.flush()
-
-                    ats_entry = AtsScore(
-                        candidate_id=str(current_user.id),
-                        job_id=str(jd.id),
-                        resume_id=resume_entry.id,
-                        resume_text=text[:10000],
-                        score=score,
-                        breakdown=breakdown,
-                        missing_skills=missing_skills,
-                        red_flags=feedback,
-                        status='New'
-                    )
-                    ats_entry.save()
-
-                    parsed_entry = ParsedData(
-                        resume_id=resume_entry.id,
-                        name=parsed_data.get('name'),
-                        email=parsed_data.get('email'),
-                        phone=parsed_data.get('phone'),
-                        skills=json.dumps(parsed_data.get('skills', [])),
-                        experience=json.dumps(parsed_data.get('experience', [])),
-                        education=json.dumps(parsed_data.get('education', [])),
-                        raw_text=text[:10000],
-                    )
-                    db.session.add(parsed_entry)
-                    processed_count += 1
-                except Exception as e:
-                    print(f"Error processing {file.filename}: {e}")
-                    
-        db.session.commit()
-        flash(f'Successfully processed {processed_count} resumes for {jd.title}', 'success')
+        jd_data = compile_job_description(jd)
+
+        uploads = [read_upload(file) for file in files
+                   if file and file.filename.lower().endswith(('.pdf', '.docx'))]
+
+        # Per-file progress, as in upload(): a re-sent batch skips finished files
+        tracker = open_batch(current_user.id, job_scope(jd), files_fingerprint(uploads), job_id=jd.id)
+        batch_id = tracker.key
+        writer = BatchWriter(on_write=tracker.record_written)
+
+        # Extraction + parsing fan out over the worker processes; scoring is
+        # one cached, vectorised batch per slice.  DB writes stay in this
+        # thread and commit, with the items' states, after every slice.
+        slices = iter_ingest_batches(tracker.admit(uploads), jd_target(jd_data),
+                                     lambda batch: calculate_jd_match_score_batch(batch, jd_data),
+                                     BATCH_CHECKPOINT_EVERY)
+        for _, items in slices:
+            store_applicants(writer, jd, [(item.upload, item) for item in items], current_user.id,
+                             batch_id, current_app.config['UPLOAD_FOLDER'])
+            tracker.settle(items, writer)
+
+        tracker.finish()
+        processed_count = len(writer.resume_ids)
+        flash(f'Successfully processed {processed_count} resumes for {jd.title}'
+              + (f' ({tracker.skipped} already imported)' if tracker.skipped else ''), 'success')
         return redirect(url_for('admin.job_applicants', job_id=job_id))
         
     ats_scores = AtsScore.objects(job_id=str(job_id)).order_by('-score')
@@ -475,110 +384,136 @@ def api_bulk_upload_resumes(job_id):
     if len(files) > 50:
         return jsonify({'error': 'Maximum 50 resumes allowed per bulk upload batch.'}), 400
 
-    jd_data = {
-        "required_skills": json.loads(jd.required_skills) if jd.required_skills else [],
-        "nice_to_have_skills": json.loads(jd.nice_to_have_skills) if jd.nice_to_have_skills else [],
-        "experience_level": jd.experience_level,
-        "education_requirement": jd.education_requirement
-    }
+    jd_data = compile_job_description(jd)
+
+    # ?stream=ndjson|sse or an Accept header selects a streaming response:
+    # one record per file as soon as it is scored, then a summary record.
+    stream = _stream_format()
 
-    results = []
+    results = [None] * len(files)
     batch_id = str(uuid.uuid4())[:8]
+    uploads = []  # (index, upload)
     
-    for file in files:
+    for index, file in enumerate(files):
         if not file.filename.lower().endswith('.pdf'):
-            results.append({"candidateName": file.filename, "score": 0, "status": "Failed (Only PDFs allowed)", "error": True})
+            results[index] = {"candidateName": file.filename, "score": 0, "status": "Failed (Only PDFs allowed)", "error": True}
             continue
             
-        # Check file size (5MB = 5 * 1024 * 1024 bytes)
-        file.seek(0, os.SEEK_END)
-        file_size = file.tell()
-        file.seek(0)
+        # Read into memory; size is checked on the buffer (5MB = 5 * 1024 * 1024 bytes)
+        upload = read_upload(file)
         
-        if file_size > 5 * 1024 * 1024:
-            results.append({"candidateName": file.filename, "score": 0, "status": "Failed (Exceeds 5MB limit)", "error": True})
+        if upload.size > 5 * 1024 * 1024:
+            results[index] = {"candidateName": file.filename, "score": 0, "status": "Failed (Exceeds 5MB limit)", "error": True}
             continue
 
-        import secrets
-        safe_name = secrets.token_hex(8) + '_' + file.filename
-        filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], safe_name)
-        file.save(filepath)
-        
-        try:
-            text = extract_text(filepath)
-            parsed_data = parse_resume(text)
-            
-            score, breakdown, feedback = calculate_jd_match_score(parsed_data, jd_data)
-            missing_skills = analyze_skill_gap(parsed_data['skills'], jd.title)
-            
-            suggestions = {
-                'weaknesses': feedback,
-                'missing_keywords': missing_skills
-            }
-            
-            analysis_json = json.dumps({
-                'score': score,
-                'breakdown': breakdown,
-                'details': parsed_data,
-                'suggestions': suggestions,
-                'role': jd.title,
-            })
-
-            resume_entry = Resume(
-                user_id=current_user.id,
-                filename=file.filename,
-                filepath=safe_name,
-                file_size=file_size,
-                score=score,
-                role_applied=jd.title,
-                analysis_data=analysis_json,
-                job_id=jd.id,
-                applicant_status='New',
-                batch_id=batch_id
-            )
-            db.session.add(resume_entry)
-            db.session.flush()
-
-            ats_entry = AtsScore(
-                candidate_id=str(current_user.id),
-                job_id=str(jd.id),
-                resume_id=resume_entry.id,
-                resume_text=text[:10000],
-                score=score,
-                breakdown=breakdown,
-                missing_skills=missing_skills,
-                red_flags=feedback,
-                status='New'
-            )
-            ats_entry.save()
-
-            parsed_entry = ParsedData(
-                resume_id=resume_entry.id,
-                name=parsed_data.get('name', 'Unknown Candidate'),
-                email=parsed_data.get('email'),
-                phone=parsed_data.get('phone'),
-                skills=json.dumps(parsed_data.get('skills', [])),
-                experience=json.dumps(parsed_data.get('experience', [])),
-                education=json.dumps(parsed_data.get('education', [])),
-                raw_text=text[:10000],
-            )
-            db.session.add(parsed_entry)
-            db.session.commit()
-            
-            candidate_name = parsed_data.get('name') or file.filename
-            results.append({
-                "candidateName": candidate_name,
-                "score": score,
-                "status": "New",
-                "error": False
-            })
-            
-        except Exception as e:
-            db.session.rollback()
-            print(f"Error processing {file.filename}: {e}")
-            results.append({"candidateName": file.filename, "score": 0, "status": "Failed (Parsing error)", "error": True})
-            
-    return jsonify(results)
+        uploads.append((index, upload))
+
+    # Streaming works through the batch a few files (one per extraction
+    # worker) at a time; a plain JSON response takes it in one slice.
+    slice_size = BULK_STREAM_SLICE if stream else len(uploads)
+    records = _bulk_upload_records(jd, jd_data, uploads, batch_id, slice_size)
+
+    if stream is None:
+        for index, result in records:
+            results[index] = result
+        return jsonify(results)
+
+    rejected = [(index, result) for index, result in enumerate(results) if result is not None]
+    return _stream_response(stream, itertools.chain(rejected, records), batch_id)
+
+
+def _bulk_upload_records(jd, jd_data, uploads, batch_id, slice_size):
+    """
+    Yield ``(index, result)`` for every ``(index, upload)``, slice by slice;
+    a slice's rows are committed before its results are yielded.
+    """
+    writer = BatchWriter()   # rows go out in a few multi-row inserts per slice
+    scorer = lambda batch: calculate_jd_match_score_batch(batch, jd_data)
+
+    # Extraction + parsing fan out over the worker processes; scoring is one
+    # cached, vectorised batch per slice.  DB writes stay in this thread.
+    for offset, items in iter_ingest_batches([upload for _, upload in uploads], jd_target(jd_data),
+                                             scorer, slice_size):
+        keys = [index for index, _ in uploads[offset:offset + len(items)]]
+        yield from store_applicants(writer, jd, zip(keys, items), current_user.id, batch_id,
+                                    current_app.config['UPLOAD_FOLDER'])
+
+
+@admin.route('/api/jobs/<int:job_id>/resumes/zip', methods=['POST'])
+@login_required
+@recruiter_required
+def api_zip_upload_resumes(job_id):
+    jd = JobDescription.query.get(job_id)
+    if not jd:
+        return jsonify({'error': 'Please select a valid job before uploading resumes. Job not found.'}), 404
+
+    file = request.files.get('archive')
+    if not file or file.filename == '':
+        return jsonify({'error': 'No archive provided.'}), 400
+
+    try:
+        # Werkzeug has spooled the upload to a temp file; members are read from it one by one
+        archive = open_archive(file.stream)
+    except ZipRejected as e:
+        return jsonify({'error': str(e)}), 400
+
+    jd_data = compile_job_description(jd)
+    stream = _stream_format()
+    # The same archive sent again for this job resumes its batch (see batches.py)
+    tracker = open_batch(current_user.id, job_scope(jd), archive_fingerprint(file.stream), job_id=jd.id)
+    batch_id = tracker.key
+
+    def records():
+        with archive:
+            yield from ingest_zip(archive, jd, jd_data, tracker, current_app.config['UPLOAD_FOLDER'])
+
+    if stream is not None:
+        return _stream_response(stream, records(), batch_id)
+
+    results = [dict(result, index=index) for index, result in records()]
+    return jsonify(dict(_batch_summary(batch_id, results), job_id=jd.id, results=results))
+
+
+def _stream_format():
+    """'ndjson' or 'sse' if the client asked for a streaming response, else None."""
+    requested = request.args.get('stream', '').lower()
+    if requested in ('ndjson', 'sse'):
+        return requested
+    accepted = [mimetype for mimetype, _ in request.accept_mimetypes]
+    if 'application/x-ndjson' in accepted:
+        return 'ndjson'
+    if 'text/event-stream' in accepted:
+        return 'sse'
+    return None
+
+
+def _batch_summary(batch_id, results):
+    """Counts over a finished batch's result records."""
+    skipped = sum(1 for result in results if result.get("skipped"))
+    failed = sum(1 for result in results if result["error"])
+    return {"batch_id": batch_id, "total": len(results),
+            "succeeded": len(results) - failed - skipped, "failed": failed, "skipped": skipped}
+
+
+def _stream_response(stream, records, batch_id):
+    """Stream ``(index, result)`` records as NDJSON lines or SSE events, then a summary."""
+    def encode(kind, payload):
+        if stream == 'sse':
+            return f"event: {kind}\ndata: {json.dumps(payload)}\n\n"
+        return json.dumps(dict(payload, type=kind)) + "\n"
+
+    def generate():
+        results = []
+        for index, result in records:
+            results.append(result)
+            yield encode('result', dict(result, index=index))
+        yield encode('summary', _batch_summary(batch_id, results))
+
+    mimetype = 'text/event-stream' if stream == 'sse' else 'application/x-ndjson'
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'     # don't let nginx buffer the stream
+    return response
 
 @admin.route('/applicants/<int:app_id>')
 @login_required
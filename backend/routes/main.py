@@ -1,14 +1,10 @@
-from flask import Blueprint, render_template, request, jsonify, current_app, redirect, url_for
+from flask import Blueprint, render_template, request, jsonify, redirect, url_for
 from flask_login import login_required, current_user
-import os
 import json
-import secrets
-import hashlib
 
-from models import db, Resume, ParsedData, Inquiry
-from utils.extractor import extract_text
-from utils.scorer import calculate_ats_score
-from utils.analyzer import parse_resume, analyze_skill_gap
+from jobs import ai_feedback_status, enqueue_upload, job_status
+from models import db, Resume, Inquiry, UploadJob
+from utils.uploads import read_upload
 from utils.decorators import candidate_required
 from mongo_models import AtsScore
 main = Blueprint('main', __name__)
@@ -20,8 +16,8 @@ def index():
         return redirect(url_for('auth.login'))
         
     try:
-        from utils.constants import TARGET_ROLES
-        target_roles = TARGET_ROLES
+        from utils.constants import get_target_roles
+        target_roles = get_target_roles()
     except ImportError:
         target_roles = {
             "Software Development": ["Frontend Developer", "Backend Developer", "Full Stack Developer", "Software Engineer"],
@@ -52,130 +48,32 @@ def upload_file():
     if not (file and allowed):
         return jsonify({'error': 'Invalid file type. Only PDF and DOCX allowed.'}), 400
 
-    # Save the uploaded file
-    safe_name = secrets.token_hex(8) + '_' + file.filename
-    filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], safe_name)
-    file.save(filepath)
-    file_size = os.path.getsize(filepath)
-
+    # Read the upload into memory (size + raw SHA-256 computed on the way in)
+    # and queue it; extraction, scoring and AI feedback run in worker.py.
+    upload = read_upload(file)
     try:
-        # --- Extract text ---
-        text = extract_text(filepath)
-
-        # ── Deduplication: SHA-256 of normalised text ────────────────────────
-        # If this user has already submitted the same resume for the same role,
-        # return the stored result immediately — no LLM call, no variance.
-        content_hash = hashlib.sha256(text.strip().lower().encode()).hexdigest()
-        cached_resume = Resume.query.filter_by(
-            user_id=current_user.id,
-            role_applied=target_role,
-            content_hash=content_hash,
-        ).order_by(Resume.created_at.desc()).first()
-
-        if cached_resume and cached_resume.analysis_data:
-            cached_result = json.loads(cached_resume.analysis_data)
-            cached_result['cached'] = True
-            return jsonify(cached_result)
-
-        # ── Full pipeline (first-time upload) ───────────────────────────────
-        parsed_data = parse_resume(text)
-        score, breakdown, feedback = calculate_ats_score(parsed_data, target_role)
-        missing_skills = analyze_skill_gap(parsed_data['skills'], target_role)
-        
-        # ── AI-powered feedback via OpenRouter ──────────────────────────────
-        from utils.ai_scorer import get_ai_feedback
-        from utils.analyzer import generate_ai_tips
-        api_key = current_app.config.get('OPENROUTER_API_KEY', '')
-        ai_result = get_ai_feedback(
-            resume_text=parsed_data.get('text', ''),
-            target_role=target_role,
-            score=score,
-            breakdown=breakdown,
-            missing_skills=missing_skills,
-            api_key=api_key,
-        )
-
-        # Use AI tips when available, fall back to rule-based tips
-        if ai_result.get('ai_powered') and ai_result.get('tips'):
-            dynamic_tips = ai_result['tips']
-        else:
-            dynamic_tips = generate_ai_tips(parsed_data)
-
-        suggestions = {
-            'strengths': ([f"Found {len(parsed_data['skills'])} relevant skills."]
-                          if parsed_data['skills'] else []),
-            'weaknesses': feedback,
-            'missing_keywords': missing_skills,
-            'improvements': dynamic_tips,
-            'ai_narrative': ai_result.get('narrative', ''),
-            'ai_powered': ai_result.get('ai_powered', False),
-        }
-        if score > 80:
-            suggestions['strengths'].append('Great ATS score!')
-
-        analysis_json = json.dumps({
-            'score': score,
-            'breakdown': breakdown,
-            'details': parsed_data,
-            'suggestions': suggestions,
-            'role': target_role,
-        })
-
-        # --- Persist Resume record ---
-        resume_entry = Resume(
-            user_id=current_user.id,
-            filename=file.filename,
-            filepath=safe_name,          # relative path inside uploads/
-            file_size=file_size,
-            score=score,
-            role_applied=target_role,
-            analysis_data=analysis_json,
-            content_hash=content_hash,   # store for future deduplication
-        )
-        db.session.add(resume_entry)
-        db.session.flush()               # get resume_entry.id before committing
-
-        ats_score = AtsScore(
-            candidate_id=str(current_user.id),
-            resume_id=resume_entry.id,
-            resume_text=text[:10000],
-            score=score,
-            breakdown=breakdown,
-            missing_skills=missing_skills,
-            red_flags=feedback,
-            status="New"
-        )
-        ats_score.save()
-
-        # --- Persist ParsedData record ---
-        parsed_entry = ParsedData(
-            resume_id=resume_entry.id,
-            name=parsed_data.get('name'),
-            email=parsed_data.get('email'),
-            phone=parsed_data.get('phone'),
-            skills=json.dumps(parsed_data.get('skills', [])),
-            experience=json.dumps(parsed_data.get('experience', [])),
-            education=json.dumps(parsed_data.get('education', [])),
-            raw_text=text[:10000],       # cap to avoid huge text blobs
-        )
-        db.session.add(parsed_entry)
-        db.session.commit()
-
-        return jsonify({
-            'score': score,
-            'breakdown': breakdown,
-            'details': parsed_data,
-            'suggestions': suggestions,
-            'role': target_role,
-            'cached': False,
-        })
-
+        job = enqueue_upload(current_user.id, upload, target_role)
     except Exception as e:
         db.session.rollback()
-        import traceback
-        traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+    status_url = url_for('main.upload_job_status', job_id=job.id)
+    response = jsonify({'job_id': job.id, 'state': job.state, 'status_url': status_url})
+    response.headers['Location'] = status_url
+    return response, 202
+
+
+@main.route('/jobs/<int:job_id>')
+@login_required
+def upload_job_status(job_id):
+    job = UploadJob.query.get_or_404(job_id)
+    if job.user_id != current_user.id:
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    response = jsonify(job_status(job))
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
 
 @main.route('/result')
 @login_required
@@ -194,9 +92,23 @@ def view_report(resume_id):
         return jsonify({'error': 'Unauthorized'}), 403
         
     analysis_data = json.loads(resume.analysis_data) if resume.analysis_data else {}
+    analysis_data['resume_id'] = resume.id
     return render_template('result.html', resume=resume, data=analysis_data)
 
 
+@main.route('/report/<int:resume_id>/ai')
+@login_required
+def report_ai_feedback(resume_id):
+    resume = Resume.query.get_or_404(resume_id)
+
+    if current_user.role not in ['admin', 'recruiter'] and resume.user_id != current_user.id:
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    response = jsonify(ai_feedback_status(resume))
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
 @main.route('/dashboard')
 @login_required
 @candidate_required
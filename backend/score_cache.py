@@ -0,0 +1,139 @@
+"""
+Score Cache
+===========
+Scoring results shared by every uploader, stored in the ``score_cache``
+table (``models.ScoreCache``).  An entry is keyed by
+
+  • content hash   – SHA-256 of the normalised extracted text
+  • target         – ``role:<name>`` or ``jd:<fingerprint>`` (see CompiledJD)
+  • scorer version – ``utils.scorer.scorer_version()``: the code version plus
+                     the role-data fingerprint
+
+and holds ``score``, ``breakdown`` and ``feedback`` — plus ``ai`` (narrative
+and tips) once the candidate flow has enriched it.  Lookups only ever match
+the current scorer version, so entries from older scoring logic are simply
+recomputed on their next use; ``sweep_score_cache`` (run by the upload
+worker) deletes them, along with entries older than
+``SCORE_CACHE_MAX_AGE_DAYS``.
+
+Nothing here commits except the sweeper: writes join the caller's
+transaction.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models import db, ScoreCache
+from utils.scorer import scorer_version
+
+SCORE_CACHE_MAX_AGE_DAYS = int(os.environ.get("SCORE_CACHE_MAX_AGE_DAYS", 90))
+SCORE_CACHE_SWEEP_INTERVAL = float(os.environ.get("SCORE_CACHE_SWEEP_INTERVAL", 3600))
+
+_LOOKUP_CHUNK = 500     # keeps IN (...) well under SQLite's variable limit
+
+
+def text_fingerprint(text: str) -> str:
+    """SHA-256 of the normalised text (the ``Resume.content_hash`` value)."""
+    return hashlib.sha256(text.strip().lower().encode()).hexdigest()
+
+
+def role_target(role: str) -> str:
+    return f"role:{role}"[:150]
+
+
+def jd_target(compiled_jd) -> str:
+    return f"jd:{compiled_jd.fingerprint}"
+
+
+def lookup_scores(content_hashes, target: str) -> dict:
+    """Return ``{content_hash: data}`` for the current scorer version."""
+    version = scorer_version()
+    hashes = list(dict.fromkeys(content_hashes))
+    found = {}
+    for start in range(0, len(hashes), _LOOKUP_CHUNK):
+        rows = ScoreCache.query.filter(
+            ScoreCache.target == target,
+            ScoreCache.scorer_version == version,
+            ScoreCache.content_hash.in_(hashes[start:start + _LOOKUP_CHUNK]),
+        ).all()
+        found.update((row.content_hash, json.loads(row.data)) for row in rows)
+    return found
+
+
+def store_scores(content_hash: str, target: str, data: dict):
+    """Add an entry; a concurrent writer's entry for the same key wins."""
+    store_many_scores(target, {content_hash: data})
+
+
+def store_many_scores(target: str, entries: dict):
+    """``store_scores`` for ``{content_hash: data}``, in one statement."""
+    if not entries:
+        return
+    version = scorer_version()
+    now = datetime.utcnow()
+    rows = [{
+        "content_hash": content_hash,
+        "target": target,
+        "scorer_version": version,
+        "data": json.dumps(data),
+        "created_at": now,
+    } for content_hash, data in entries.items()]
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "sqlite":
+        db.session.execute(sqlite.insert(ScoreCache).on_conflict_do_nothing(), rows)
+    elif dialect == "postgresql":
+        db.session.execute(postgresql.insert(ScoreCache).on_conflict_do_nothing(), rows)
+    else:
+        for row in rows:
+            if not _entry(row["content_hash"], target, version):
+                db.session.add(ScoreCache(**row))
+
+
+def update_scores(content_hash: str, target: str, **fields):
+    """Merge ``fields`` into the current-version entry, if there is one."""
+    row = _entry(content_hash, target, scorer_version())
+    if row is not None:
+        data = json.loads(row.data)
+        data.update(fields)
+        row.data = json.dumps(data)
+
+
+def _entry(content_hash, target, version):
+    return ScoreCache.query.filter_by(
+        content_hash=content_hash, target=target, scorer_version=version
+    ).first()
+
+
+def cached_batch_scores(parsed_resumes: list, content_hashes: list, target: str, batch_scorer) -> list:
+    """
+    ``(score, breakdown, feedback)`` per resume, in order.  Cached entries
+    are reused; the rest go through ``batch_scorer(parsed_list)`` in one
+    call and are added to the cache.
+    """
+    found = lookup_scores(content_hashes, target)
+    todo = {}
+    for parsed, content_hash in zip(parsed_resumes, content_hashes):
+        if content_hash not in found and content_hash not in todo:
+            todo[content_hash] = parsed
+
+    fresh = {}
+    for content_hash, (score, breakdown, feedback) in zip(todo, batch_scorer(list(todo.values()))):
+        fresh[content_hash] = {"score": score, "breakdown": breakdown, "feedback": feedback}
+    store_many_scores(target, fresh)
+    found.update(fresh)
+
+    return [(found[h]["score"], found[h]["breakdown"], found[h]["feedback"]) for h in content_hashes]
+
+
+def sweep_score_cache() -> int:
+    """Delete entries from other scorer versions or past the age limit."""
+    cutoff = datetime.utcnow() - timedelta(days=SCORE_CACHE_MAX_AGE_DAYS)
+    deleted = ScoreCache.query.filter(
+        (ScoreCache.scorer_version != scorer_version()) | (ScoreCache.created_at < cutoff)
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
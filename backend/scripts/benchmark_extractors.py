@@ -0,0 +1,139 @@
+"""
+Extractor backend benchmark
+===========================
+Runs every installed extractor backend (see utils/extractor.py) over a local
+corpus of PDF/DOCX files and reports, per backend:
+
+  • throughput      – files/s and MB/s
+  • latency         – p50 / p95 per file
+  • peak RSS        – of a fresh process running only that backend
+  • text yield      – characters extracted vs. the best backend for each file
+
+Usage (from backend/):
+    python scripts/benchmark_extractors.py path/to/corpus [--repeat 3] [--no-budget]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.extractor import MAX_CHARS, MAX_PAGES, installed_backends  # noqa: E402
+
+FORMATS = ('.pdf', '.docx')
+
+
+def find_files(corpus):
+    files = {ext: [] for ext in FORMATS}
+    for root, _, names in os.walk(corpus):
+        for name in sorted(names):
+            ext = os.path.splitext(name)[1].lower()
+            if ext in files:
+                files[ext].append(os.path.join(root, name))
+    return files
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+# ---------------------------------------------------------------------------
+# Worker: one backend, one process (so peak RSS is its own)
+# ---------------------------------------------------------------------------
+
+def run_worker(name, ext, repeat, budget, paths):
+    import resource
+
+    backend = next(b for b in installed_backends(ext) if b.name == name)
+    max_chars, max_pages = (MAX_CHARS, MAX_PAGES) if budget else (0, 0)
+    payloads = []
+    for path in paths:
+        with open(path, 'rb') as fh:
+            payloads.append(fh.read())
+
+    backend.extract(payloads[0], max_chars, max_pages)   # warm-up: imports, caches
+
+    latencies, chars, errors = [], [], 0
+    for data in payloads:
+        runs = []
+        text = ""
+        for _ in range(repeat):
+            start = time.perf_counter()
+            try:
+                text = backend.extract(data, max_chars, max_pages)
+            except Exception:
+                text = ""
+                errors += 1
+            runs.append(time.perf_counter() - start)
+        latencies.append(sum(runs) / len(runs))
+        chars.append(len(text.strip()))
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        "latencies": latencies,
+        "chars": chars,
+        "bytes": sum(len(p) for p in payloads),
+        "peak_rss_mb": peak_kb / 1024,
+        "errors": errors,
+    }))
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark extractor backends over a corpus.")
+    parser.add_argument("corpus", help="directory of .pdf / .docx files (searched recursively)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per file (latency is the mean)")
+    parser.add_argument("--no-budget", action="store_true", help="extract whole files (ignore MAX_CHARS/MAX_PAGES)")
+    parser.add_argument("--worker", nargs=2, metavar=("BACKEND", "EXT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        name, ext = args.worker
+        run_worker(name, ext, args.repeat, not args.no_budget, find_files(args.corpus)[ext])
+        return
+
+    files = find_files(args.corpus)
+    for ext in FORMATS:
+        paths = files[ext]
+        backends = installed_backends(ext)
+        if not paths or not backends:
+            continue
+
+        results = {}
+        for backend in backends:
+            cmd = [sys.executable, os.path.abspath(__file__), args.corpus,
+                   "--repeat", str(args.repeat), "--worker", backend.name, ext]
+            if args.no_budget:
+                cmd.append("--no-budget")
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+            if proc.returncode != 0:
+                print(f"[-] {backend.name} failed:\n{proc.stderr}")
+                continue
+            results[backend.name] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+        if not results:
+            continue
+        best = [max(r["chars"][i] for r in results.values()) for i in range(len(paths))]
+
+        print(f"\n{ext}  ({len(paths)} files, {args.repeat} runs each)")
+        print(f"{'backend':<14}{'files/s':>9}{'MB/s':>8}{'p50 ms':>9}{'p95 ms':>9}"
+              f"{'peak RSS':>10}{'yield':>8}{'errors':>8}")
+        for name, r in results.items():
+            total = sum(r["latencies"]) or 1e-9
+            yield_ratio = sum(r["chars"]) / (sum(best) or 1)
+            print(f"{name:<14}{len(paths) / total:>9.1f}{r['bytes'] / total / 1e6:>8.2f}"
+                  f"{percentile(r['latencies'], 50) * 1000:>9.1f}{percentile(r['latencies'], 95) * 1000:>9.1f}"
+                  f"{r['peak_rss_mb']:>8.0f}MB{yield_ratio:>8.0%}{r['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
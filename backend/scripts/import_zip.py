@@ -0,0 +1,66 @@
+"""
+ZIP resume import
+=================
+Imports a ZIP archive of PDF/DOCX resumes as applicants of a job, the same
+way ``POST /admin/api/jobs/<id>/resumes/zip`` does (see zip_ingest.py), but
+reading the archive from disk — no request size limit, no web worker tied up.
+If an import is interrupted, run the same command again: members already
+imported are skipped.
+
+Usage (from backend/):
+    python scripts/import_zip.py resumes.zip --job 3 [--user admin] [--quiet]
+
+Prints one line per member and a summary with the batch id.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from batches import job_scope, open_batch  # noqa: E402
+from models import JobDescription, User  # noqa: E402
+from utils.scorer import compile_job_description  # noqa: E402
+from zip_ingest import ZipRejected, archive_fingerprint, ingest_zip, open_archive  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a ZIP of resumes as applicants of a job.")
+    parser.add_argument("archive", help="path to the .zip file")
+    parser.add_argument("--job", type=int, required=True, help="JobDescription id to attach the applicants to")
+    parser.add_argument("--user", default="admin", help="username recorded as the uploader (default: admin)")
+    parser.add_argument("--quiet", action="store_true", help="only print the summary")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        jd = JobDescription.query.get(args.job)
+        if jd is None:
+            sys.exit(f"[-] Job {args.job} not found")
+        user = User.query.filter_by(username=args.user).first()
+        if user is None:
+            sys.exit(f"[-] User {args.user!r} not found")
+        try:
+            archive = open_archive(args.archive)
+        except ZipRejected as e:
+            sys.exit(f"[-] {e}")
+
+        # Running the same archive again for the job resumes an interrupted import
+        with open(args.archive, 'rb') as fh:
+            tracker = open_batch(user.id, job_scope(jd), archive_fingerprint(fh), job_id=jd.id)
+        counts = {"imported": 0, "failed": 0, "skipped": 0}
+        with archive:
+            for index, result in ingest_zip(archive, jd, compile_job_description(jd), tracker,
+                                            app.config['UPLOAD_FOLDER']):
+                kind = "skipped" if result.get("skipped") else "failed" if result["error"] else "imported"
+                counts[kind] += 1
+                if not args.quiet:
+                    print(f"{index:>5}  {result['status']:<32} {result['score']:>4}  {result['candidateName']}")
+
+        print(f"[+] Batch {tracker.key} for job {jd.id} ({jd.title}): "
+              f"{counts['imported']} imported, {counts['failed']} failed, {counts['skipped']} skipped")
+
+
+if __name__ == "__main__":
+    main()
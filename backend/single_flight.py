@@ -0,0 +1,124 @@
+"""
+Single-flight
+=============
+Makes concurrent work on the same key run once.  The first caller to enter
+``single_flight(key)`` holds the key; later callers — other threads in this
+process, or other processes sharing the database — wait until it is
+released and then run their block, by which time the first caller's result
+is normally in a cache (score_cache.py) for them to reuse.
+
+Two layers:
+
+  • in-process – one ``threading.Lock`` per active key, so threads never
+    poll the database for each other;
+  • cross-process – an advisory lock row in the ``flight_lock`` table
+    (``models.FlightLock``), inserted and deleted in their own short
+    transactions.  Rows expire after ``ttl`` seconds, so a holder that
+    crashed can only block a key for that long.
+
+A waiter keeps polling while the lock row is held or the database is busy
+(another connection's write transaction outlasting the busy timeout); one
+that gives up after ``wait_timeout`` seconds runs its block anyway (``single_flight`` then yields False): duplicated work is better
+than a stuck upload.
+"""
+
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy.exc import DBAPIError, IntegrityError
+
+from models import db, FlightLock
+
+FLIGHT_LOCK_TTL = float(os.environ.get("FLIGHT_LOCK_TTL", 180))
+FLIGHT_WAIT_TIMEOUT = float(os.environ.get("FLIGHT_WAIT_TIMEOUT", 180))
+FLIGHT_POLL_INTERVAL = 0.25
+
+_OWNER_PREFIX = f"{socket.gethostname()}:{os.getpid()}"
+
+_local_locks = {}       # key -> [threading.Lock, number of users]
+_local_guard = threading.Lock()
+
+
+@contextmanager
+def single_flight(key: str, ttl: float = FLIGHT_LOCK_TTL, wait_timeout: float = FLIGHT_WAIT_TIMEOUT):
+    """
+    Hold ``key`` for the duration of the block; yields True if the lock was
+    obtained.  If the block raises, the session is rolled back before the
+    lock is released (the release needs a free database).
+    """
+    deadline = time.monotonic() + wait_timeout
+    entry = _local_entry(key)
+    local_held = entry[0].acquire(timeout=max(0.0, wait_timeout))
+    try:
+        owner = f"{_OWNER_PREFIX}:{threading.get_ident()}"
+        held = local_held and _acquire(key, owner, ttl, deadline)
+        try:
+            yield held
+        except BaseException:
+            db.session.rollback()
+            raise
+        finally:
+            if held:
+                _release(key, owner)
+    finally:
+        if local_held:
+            entry[0].release()
+        _drop_local_entry(key)
+
+
+# ---------------------------------------------------------------------------
+# In-process layer
+# ---------------------------------------------------------------------------
+
+def _local_entry(key):
+    with _local_guard:
+        entry = _local_locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+        return entry
+
+
+def _drop_local_entry(key):
+    with _local_guard:
+        entry = _local_locks[key]
+        entry[1] -= 1
+        if entry[1] == 0:
+            del _local_locks[key]
+
+
+# ---------------------------------------------------------------------------
+# Cross-process layer (flight_lock table)
+# ---------------------------------------------------------------------------
+
+def _acquire(key, owner, ttl, deadline) -> bool:
+    table = FlightLock.__table__
+    while True:
+        now = datetime.utcnow()
+        try:
+            with db.engine.begin() as conn:
+                # Take over a lock whose holder died without releasing it
+                conn.execute(table.delete().where(table.c.key == key, table.c.expires_at < now))
+                conn.execute(table.insert().values(key=key, owner=owner,
+                                                   expires_at=now + timedelta(seconds=ttl)))
+            return True
+        except IntegrityError:
+            pass
+        except DBAPIError as e:
+            # "database is locked" and the like: someone else is writing, keep waiting
+            current_app.logger.info("Flight lock %s: database busy (%s), retrying", key, e)
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(FLIGHT_POLL_INTERVAL)
+
+
+def _release(key, owner):
+    table = FlightLock.__table__
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(table.delete().where(table.c.key == key, table.c.owner == owner))
+    except Exception as e:
+        current_app.logger.warning("Could not release flight lock %s (it expires after its TTL): %s", key, e)
@@ -1,21 +1,29 @@
 import re
 
+from utils.knowledge_base import get_knowledge_base
+from utils.matcher import KeywordMatcher
+from utils.resume_text import ResumeText
+
 def parse_resume(text):
     """
     Parses resume text to extract key sections.
-    Stores the full original text (lowercased) in 'text' so the
-    scorer can do rich keyword matching.
+    Stores the full original text (lowercased, as a ``ResumeText``) in
+    'text' so the scorer can do rich keyword matching without
+    re-normalising it.
     """
-    text_lower = text.lower()
+    text_lower = ResumeText.of(text)
+    skill_hits = scan_skills(text_lower)
+    sections = segment_sections(text_lower)
 
     data = {
         "name":           extract_name(text_lower),
         "email":          extract_email(text_lower),
         "phone":          extract_phone(text_lower),
-        "skills":         extract_skills(text_lower),
-        "education":      extract_section(text_lower, ["education", "academic", "qualification", "degree", "university", "college"]),
-        "experience":     extract_section(text_lower, ["experience", "employment", "work history", "career", "internship"]),
-        "projects":       extract_section(text_lower, ["projects", "portfolio", "github", "personal work"]),
+        "skills":         extract_skills(text_lower, skill_hits),
+        "skill_counts":   {skill: len(pos) for skill, pos in skill_hits.items()},
+        "education":      sections["education"]["lines"],
+        "experience":     sections["experience"]["lines"],
+        "projects":       sections["projects"]["lines"],
         "summary":        "summary" in text_lower or "profile" in text_lower or "objective" in text_lower,
         "certifications": "certifications" in text_lower or "certificates" in text_lower or "certified" in text_lower,
         # Full lowercase text – primary field used by scorer for keyword matching
@@ -24,41 +32,89 @@ def parse_resume(text):
     return data
 
 
-def extract_section(text: str, trigger_words: list) -> list:
+# Section name -> heading trigger words
+SECTION_TRIGGERS = {
+    "education":  ["education", "academic", "qualification", "degree", "university", "college"],
+    "experience": ["experience", "employment", "work history", "career", "internship"],
+    "projects":   ["projects", "portfolio", "github", "personal work"],
+}
+
+# Maximum body lines captured after a section heading
+SECTION_MAX_LINES = 15
+
+
+def _compile_triggers(section_triggers: dict):
+    """Return (substring matcher over all triggers, trigger -> section names)."""
+    owners = {}
+    for name, triggers in section_triggers.items():
+        for tw in triggers:
+            owners.setdefault(tw, []).append(name)
+    return KeywordMatcher(list(owners), word_boundary=False), owners
+
+
+_SECTION_MATCHER, _TRIGGER_OWNERS = _compile_triggers(SECTION_TRIGGERS)
+
+
+def segment_sections(text: str, section_triggers: dict = None) -> dict:
     """
-    Returns a list of lines that appear after any of the trigger_words
-    (acting as section headings) up to 15 lines.  If nothing found,
-    returns a one-element list with an empty string so boolean checks
-    still work correctly.
+    Walks the lines of ``text`` once and assigns each line to every section
+    it belongs to.  Returns ``{section: {"lines": [...], "offsets": [...]}}``
+    where ``offsets`` are the indices of the captured lines in
+    ``text.splitlines()``.
+
+    Capture rules (per section, identical to running ``extract_section``
+    once per section): a short line (< 60 chars) containing one of the
+    section's trigger words starts the section; up to 15 following lines are
+    captured; a blank line ends the capture.
     """
-    lines = text.splitlines()
-    result = []
-    capturing = False
-    captured = 0
+    if section_triggers is None:
+        matcher, owners = _SECTION_MATCHER, _TRIGGER_OWNERS
+        section_triggers = SECTION_TRIGGERS
+    else:
+        matcher, owners = _compile_triggers(section_triggers)
 
-    for line in lines:
+    sections = {name: {"lines": [], "offsets": []} for name in section_triggers}
+    capturing = {}          # section name -> body lines captured so far
+    lines = text.lines if isinstance(text, ResumeText) else text.splitlines()
+
+    for idx, line in enumerate(lines):
         stripped = line.strip()
         if not stripped:
-            if capturing:
-                # blank line might end a section
-                capturing = False
+            # blank line might end a section
+            capturing.clear()
             continue
 
-        # Check if this line is a section header
-        is_header = any(tw in stripped for tw in trigger_words) and len(stripped) < 60
-        if is_header:
-            capturing = True
-            result.append(stripped)
-            captured = 0
-            continue
+        # Sections for which this line is a header
+        headers = set()
+        if len(stripped) < 60:
+            for tw in matcher.find_all(stripped):
+                headers.update(owners[tw])
 
-        if capturing:
-            result.append(stripped)
-            captured += 1
-            if captured >= 15:
-                capturing = False
+        for name in headers:
+            sections[name]["lines"].append(stripped)
+            sections[name]["offsets"].append(idx)
+            capturing[name] = 0
 
-    return result if result else []
+        for name in list(capturing):
+            if name in headers:
+                continue
+            sections[name]["lines"].append(stripped)
+            sections[name]["offsets"].append(idx)
+            capturing[name] += 1
+            if capturing[name] >= SECTION_MAX_LINES:
+                del capturing[name]
+
+    return sections
+
+
+def extract_section(text: str, trigger_words: list) -> list:
+    """
+    Returns a list of lines that appear after any of the trigger_words
+    (acting as section headings) up to 15 lines.  Returns an empty list if
+    nothing is found.  Prefer ``segment_sections`` when several sections
+    are needed from the same text.
+    """
+    return segment_sections(text, {"section": trigger_words})["section"]["lines"]
 
 def extract_name(text):
     # Improved regex for name extraction - looks for capitalized words at start
@@ -83,59 +139,46 @@ def extract_phone(text):
     match = re.search(phone_pattern, text)
     return match.group(0) if match else None
 
-def extract_skills(text):
-    # Common tech skills dictionary - can be expanded
-    common_skills = [
-        "python", "java", "javascript", "react", "angular", "vue", "html", "css",
-        "sql", "nosql", "mongodb", "postgresql", "mysql", "flask", "django",
-        "node.js", "express", "aws", "azure", "docker", "kubernetes", "git",
-        "c++", "c#", "ruby", "php", "swift", "kotlin", "go", "rust",
-        "machine learning", "deep learning", "nlp", "pandas", "numpy", "scikit-learn",
-        "tensorflow", "pytorch", "tableau", "power bi", "excel", "communication",
-        "leadership", "teamwork", "agile", "scrum", "ci/cd", "rest api", "graphql",
-        "typescript", "next.js", "redux", "jest", "cypress", "selenium"
-    ]
-    
-    found_skills = []
-    for skill in common_skills:
-        # Check for skill existence with boundaries
-        if re.search(r'\b' + re.escape(skill) + r'\b', text):
-            found_skills.append(skill.upper())
-    
-    return sorted(set(found_skills))  # sorted → deterministic order every run
+# Common tech skills dictionary - can be expanded
+COMMON_SKILLS = [
+    "python", "java", "javascript", "react", "angular", "vue", "html", "css",
+    "sql", "nosql", "mongodb", "postgresql", "mysql", "flask", "django",
+    "node.js", "express", "aws", "azure", "docker", "kubernetes", "git",
+    "c++", "c#", "ruby", "php", "swift", "kotlin", "go", "rust",
+    "machine learning", "deep learning", "nlp", "pandas", "numpy", "scikit-learn",
+    "tensorflow", "pytorch", "tableau", "power bi", "excel", "communication",
+    "leadership", "teamwork", "agile", "scrum", "ci/cd", "rest api", "graphql",
+    "typescript", "next.js", "redux", "jest", "cypress", "selenium"
+]
+
+# Compiled once at import – one scan of the text finds every skill
+_SKILL_MATCHER = KeywordMatcher(COMMON_SKILLS)
+
+
+def scan_skills(text):
+    """
+    Single pass over lowercased text.  Returns {SKILL: [start offsets]} for
+    every common skill found, so callers get match counts and positions
+    without rescanning the text.
+    """
+    hits = {}
+    for skill, start in _SKILL_MATCHER.iter_matches(text):
+        hits.setdefault(skill.upper(), []).append(start)
+    return {skill: sorted(positions) for skill, positions in sorted(hits.items())}
+
+def extract_skills(text, skill_hits=None):
+    if skill_hits is None:
+        skill_hits = scan_skills(text)
+    return sorted(skill_hits)  # sorted → deterministic order every run
 
 def analyze_skill_gap(found_skills, target_role):
     """
     Analyzes missing skills based on target role.
     """
-    role_skills = {
-        "Frontend Developer": ["HTML", "CSS", "JAVASCRIPT", "REACT", "ANGULAR", "VUE", "GIT", "TYPESCRIPT", "NEXT.JS"],
-        "Backend Developer": ["PYTHON", "JAVA", "NODE.JS", "SQL", "MONGODB", "DOCKER", "API", "AWS", "REDIS", "POSTGRESQL"],
-        "Full Stack Developer": ["HTML", "CSS", "JAVASCRIPT", "REACT", "NODE.JS", "PYTHON", "SQL", "GIT", "DOCKER", "AWS"],
-        "Software Engineer": ["JAVA", "PYTHON", "C++", "DATA STRUCTURES", "ALGORITHMS", "GIT", "SYSTEM DESIGN", "SQL"],
-        "Web Developer": ["HTML", "CSS", "JAVASCRIPT", "PHP", "WORDPRESS", "SEO", "BOOTSTRAP", "JQUERY"],
-        "Mobile App Developer": ["SWIFT", "KOTLIN", "REACT NATIVE", "FLUTTER", "IOS", "ANDROID", "DART", "FIREBASE"],
-        "Data Scientist": ["PYTHON", "SQL", "PANDAS", "NUMPY", "SCIKIT-LEARN", "TENSORFLOW", "TABLEAU", "POWER BI", "STATISTICS"],
-        "Machine Learning Engineer": ["PYTHON", "TENSORFLOW", "PYTORCH", "SCIKIT-LEARN", "MLOPS", "DATA MODELING", "DEEP LEARNING"],
-        "AI Engineer": ["PYTHON", "DEEP LEARNING", "NLP", "COMPUTER VISION", "TENSORFLOW", "PYTORCH", "KERAS", "OPENCV"],
-        "DevOps Engineer": ["AWS", "DOCKER", "KUBERNETES", "CI/CD", "LINUX", "BASH", "PYTHON", "TERRAFORM", "ANSIBLE"],
-        "Cloud Engineer": ["AWS", "AZURE", "GOOGLE CLOUD", "TERRAFORM", "DOCKER", "KUBERNETES", "LINUX", "NETWORKING"],
-        "Site Reliability Engineer (SRE)": ["LINUX", "PYTHON", "GO", "ANSIBLE", "TERRAFORM", "MONITORING", "CI/CD", "KUBERNETES"],
-        "Cybersecurity Analyst": ["NETWORK SECURITY", "LINUX", "PYTHON", "SIEM", "FIREWALLS", "WIRESHARK", "RISK ASSESSMENT"],
-        "Penetration Tester": ["KALI LINUX", "METASPLOIT", "BURP SUITE", "PYTHON", "BASH", "NETWORK SECURITY", "ETHICAL HACKING"],
-        "Blockchain Developer": ["SOLIDITY", "ETHEREUM", "SMART CONTRACTS", "WEB3.JS", "CRYPTOGRAPHY", "RUST", "GO"],
-        "Embedded Systems Engineer": ["C", "C++", "MICROCONTROLLERS", "RTOS", "PCB DESIGN", "IOT", "FIRMWARE"],
-        "Game Developer": ["C++", "C#", "UNITY", "UNREAL ENGINE", "3D MATH", "GRAPHICS PROGRAMMING", "OPENGL", "DIRECTX"],
-        "Database Administrator (DBA)": ["SQL", "POSTGRESQL", "MYSQL", "ORACLE", "PERFORMANCE TUNING", "BACKUP/RECOVERY", "NOSQL"],
-        "Data Engineer": ["PYTHON", "SQL", "SPARK", "HADOOP", "KAFKA", "ETL", "WAREHOUSING", "AIRFLOW", "AWS"],
-        "QA / Automation Test Engineer": ["SELENIUM", "PYTHON", "JAVA", "JIRA", "CYPRESS", "TESTNG", "JUNIT", "API TESTING"],
-        "Network Engineer": ["CISCO", "TCP/IP", "ROUTING", "SWITCHING", "VPN", "FIREWALLS", "WIRESHARK", "BGP", "OSPF"],
-        "Systems Engineer": ["LINUX", "WINDOWS SERVER", "VIRTUALIZATION", "VMWARE", "BASH", "POWERSHELL", "ACTIVE DIRECTORY"]
-    }
-    
-    target_skills = role_skills.get(target_role, [])
+    # Role → expected skills comes from the role knowledge base (alias-aware)
+    target_skills = get_knowledge_base().gap_skills_for(target_role)
     # Case insensitive comparison
-    found_skills_upper = [s.upper() for s in found_skills]
+    found_skills_upper = {s.upper() for s in found_skills}
     missing = [skill for skill in target_skills if skill not in found_skills_upper]
     
     return missing
@@ -162,7 +205,7 @@ def generate_ai_tips(data):
     Generates dynamic AI power tips based on parsed resume data.
     """
     tips = []
-    text = data.get('text', '').lower()
+    text = ResumeText.of(data.get('text', ''))
     
     # 1. Check for Quantifiable Achievements (Numbers/Percentages)
     # Looking for digits followed by % or numbers indicating scale
@@ -0,0 +1,71 @@
+"""
+Extraction Cache
+================
+Content-addressed cache of extraction results, keyed by the SHA-256 of the
+raw uploaded bytes (computed while the upload streams in, see
+``utils/uploads.py``).  A byte-identical re-upload — the same resume sent to
+several jobs, or submitted twice — skips PDF/DOCX parsing and
+``parse_resume`` entirely.
+
+Entries hold the extracted text and the parse result.  The cache is an
+in-process LRU bounded both by entry count and by total cached characters.
+Failed extractions are never cached.
+"""
+
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+CACHE_MAX_ENTRIES = int(os.environ.get("EXTRACTION_CACHE_ENTRIES", 512))
+CACHE_MAX_CHARS = int(os.environ.get("EXTRACTION_CACHE_CHARS", 32 * 1024 * 1024))
+
+CachedExtraction = namedtuple("CachedExtraction", ["text", "parsed"])
+
+
+class ExtractionCache:
+    """Thread-safe LRU of ``sha256 -> CachedExtraction``."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_chars: int = CACHE_MAX_CHARS):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self._entries = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, sha256: str):
+        """Return the cached entry (marking it recently used), else None."""
+        with self._lock:
+            entry = self._entries.get(sha256)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(sha256)
+            self.hits += 1
+            return entry
+
+    def put(self, sha256: str, text: str, parsed: dict):
+        size = len(text)
+        if self.max_entries <= 0 or size > self.max_chars:
+            return
+        with self._lock:
+            old = self._entries.pop(sha256, None)
+            if old is not None:
+                self._chars -= len(old.text)
+            self._entries[sha256] = CachedExtraction(text, parsed)
+            self._chars += size
+            while len(self._entries) > self.max_entries or self._chars > self.max_chars:
+                _, evicted = self._entries.popitem(last=False)
+                self._chars -= len(evicted.text)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._chars = 0
+
+
+extraction_cache = ExtractionCache()
@@ -1,37 +1,364 @@
+import importlib.util
+import io
 import os
-import PyPDF2
-import docx
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import namedtuple
 
-def extract_text(filepath):
+from utils import worker_pool
+
+# Extraction budget.  Resumes are a few pages long; past this point extra
+# pages only cost parse time (stored text is capped at 10k characters and the
+# AI prompt uses the first 3k).  Pass 0 / None to disable a limit.
+MAX_PAGES = 8
+MAX_CHARS = 40000
+
+# Sandboxed extraction pool (see utils/worker_pool.py).  EXTRACT_WORKERS=0
+# runs extraction in the calling thread, as does any non-POSIX platform.
+EXTRACT_WORKERS = int(os.environ.get("EXTRACT_WORKERS", min(4, os.cpu_count() or 1)))
+EXTRACT_TIMEOUT = float(os.environ.get("EXTRACT_TIMEOUT", 20))
+EXTRACT_MEMORY_MB = int(os.environ.get("EXTRACT_MEMORY_MB", 512))
+EXTRACT_MAX_JOBS = int(os.environ.get("EXTRACT_MAX_JOBS", 50))
+
+# A backend result shorter than this (stripped) counts as a failed read and
+# the next backend for the format is tried.
+MIN_TEXT_CHARS = 50
+
+# Comma-separated backend names to use, in order (default: every installed
+# backend, fastest first) — e.g. EXTRACT_BACKENDS=pypdf2,python-docx
+EXTRACT_BACKENDS = [b.strip() for b in os.environ.get("EXTRACT_BACKENDS", "").split(",") if b.strip()]
+
+ExtractionResult = namedtuple("ExtractionResult", ["ok", "text", "error", "backend"])
+
+
+class ExtractionError(Exception):
+    """A file could not be extracted (timeout, memory cap, crash)."""
+
+
+def _pool():
+    if EXTRACT_WORKERS <= 0 or not worker_pool.available():
+        return None
+    return worker_pool.get_pool(
+        "extract",
+        size=EXTRACT_WORKERS,
+        timeout=EXTRACT_TIMEOUT,
+        memory_limit_mb=EXTRACT_MEMORY_MB,
+        max_jobs=EXTRACT_MAX_JOBS,
+    )
+
+
+def extract_file(source, max_chars=MAX_CHARS, max_pages=MAX_PAGES, filename=None):
     """
-    Extracts text from a PDF or DOCX file.
+    Extract one file in a sandboxed worker and return an ``ExtractionResult``
+    (``ok=False`` with an ``error`` instead of raising or hanging).
     """
-    ext = os.path.splitext(filepath)[1].lower()
-    
-    if ext == '.pdf':
-        return extract_text_from_pdf(filepath)
-    elif ext == '.docx':
-        return extract_text_from_docx(filepath)
-    else:
-        return ""
+    return extract_files([source], max_chars, max_pages, [filename])[0]
 
-def extract_text_from_pdf(pdf_path):
-    text = ""
-    try:
-        with open(pdf_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-    except Exception as e:
-        print(f"Error reading PDF: {e}")
-    return text
 
-def extract_text_from_docx(docx_path):
-    text = ""
+def extract_files(sources, max_chars=MAX_CHARS, max_pages=MAX_PAGES, filenames=None):
+    """
+    Extract many files in parallel; results keep input order.
+
+    Each source is a path, a bytes-like buffer or a binary file-like object;
+    ``filenames`` (same order) tell buffers apart by extension.
+    """
+    sources = [_payload(source) for source in sources]
+    filenames = filenames or [None] * len(sources)
+    jobs = run_jobs("utils.extractor:extract_with_backend",
+                    [(source, max_chars, max_pages, name) for source, name in zip(sources, filenames)])
+    return [ExtractionResult(True, job.value[0], None, job.value[1]) if job.ok
+            else ExtractionResult(False, "", job.error, None)
+            for job in jobs]
+
+
+def run_jobs(target: str, arg_tuples: list) -> list:
+    """
+    Run ``target`` (``"module:function"``) once per argument tuple in the
+    sandboxed extraction pool, in parallel, or in this thread if there is no
+    pool.  Returns ``worker_pool.JobResult``s in input order.
+    """
+    pool = _pool()
+    if pool is None:
+        return [worker_pool.run_inline(target, *args) for args in arg_tuples]
+    return pool.map(target, arg_tuples)
+
+
+def extract_text(source, max_chars=MAX_CHARS, max_pages=MAX_PAGES, filename=None):
+    """
+    Extracts text from a PDF or DOCX file, stopping once the budget is met.
+    ``source`` is a path, a bytes-like buffer or a binary file-like object
+    (pass ``filename`` for buffers so the type is known).
+    Runs in the sandboxed pool; raises ``ExtractionError`` if the worker
+    timed out, hit its memory cap or crashed.
+    """
+    result = extract_file(source, max_chars, max_pages, filename)
+    if not result.ok:
+        raise ExtractionError(f"Extraction failed ({result.error})")
+    return result.text
+
+
+def _payload(source):
+    """Paths and bytes go to the workers as-is; file objects are read once."""
+    if isinstance(source, (str, os.PathLike, bytes)):
+        return source
+    if isinstance(source, (bytearray, memoryview)):
+        return bytes(source)
+    return source.read()
+
+
+def _document_type(source, filename=None) -> str:
+    """'.pdf' / '.docx' from the file name, else sniffed from the magic bytes."""
+    if filename is None and isinstance(source, (str, os.PathLike)):
+        filename = os.fspath(source)
+    if filename:
+        return os.path.splitext(filename)[1].lower()
+    head = bytes(source[:4])
+    if head == b'%PDF':
+        return '.pdf'
+    if head == b'PK\x03\x04':
+        return '.docx'
+    return ''
+
+
+def extract_text_inline(source, max_chars=MAX_CHARS, max_pages=MAX_PAGES, filename=None):
+    """
+    Extracts text in the current process.
+    """
+    return extract_with_backend(source, max_chars, max_pages, filename)[0]
+
+
+def extract_with_backend(source, max_chars=MAX_CHARS, max_pages=MAX_PAGES, filename=None):
+    """
+    Return ``(text, backend name)`` using the first available backend for the
+    format that succeeds with non-trivial text (this is what the workers run).
+    If every backend fails or comes back near-empty, the longest text wins
+    (backend None if none produced anything).
+    """
+    source = _payload(source)
+    return _extract_as(_document_type(source, filename), source, max_chars, max_pages)
+
+
+def _extract_as(ext, source, max_chars, max_pages):
+    best_text, best_backend = "", None
+    for backend in available_backends(ext):
+        try:
+            text = backend.extract(source, max_chars, max_pages)
+        except Exception as e:
+            print(f"Extractor backend {backend.name} failed: {e}")
+            continue
+        if len(text.strip()) >= MIN_TEXT_CHARS:
+            return text, backend.name
+        if best_backend is None or len(text.strip()) > len(best_text.strip()):
+            best_text, best_backend = text, backend.name
+    return best_text, best_backend
+
+
+# ---------------------------------------------------------------------------
+# Backend registry
+# ---------------------------------------------------------------------------
+# Backends are registered per format, fastest first.  Each names the module
+# it needs; it is only used if that module is installed, so every backend
+# other than the stdlib DOCX reader is an optional dependency.  A backend
+# takes (path or bytes, max_chars, max_pages) and raises on failure.
+# Order follows scripts/benchmark_extractors.py on our sample corpus.
+
+Backend = namedtuple("Backend", ["name", "module", "extract"])
+
+BACKENDS = {}
+
+
+def register_backend(ext: str, name: str, module: str):
+    """Decorator: add an extractor backend for ``ext`` (lowest priority so far)."""
+    def register(extract):
+        BACKENDS.setdefault(ext, []).append(Backend(name, module, extract))
+        return extract
+    return register
+
+
+def installed_backends(ext: str) -> list:
+    """Every registered backend for a format whose module is importable."""
+    return [b for b in BACKENDS.get(ext, []) if importlib.util.find_spec(b.module) is not None]
+
+
+def available_backends(ext: str) -> list:
+    """Installed backends for a format, in the order they are tried."""
+    installed = installed_backends(ext)
+    if EXTRACT_BACKENDS:
+        by_name = {b.name: b for b in installed}
+        return [by_name[name] for name in EXTRACT_BACKENDS if name in by_name]
+    return installed
+
+
+def _stream(source):
+    """A fresh binary stream (or the path) for one backend attempt."""
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+
+def _join_within_budget(chunks, label, max_chars=None, max_pages=None, strict=False):
+    """
+    Consume ``chunks`` lazily until the character or chunk budget is met and
+    join them once, each followed by a newline.  Errors while producing
+    chunks are logged and the text gathered so far is returned (with
+    ``strict`` they are re-raised instead).
+    """
+    parts = []
+    total = 0
     try:
-        doc = docx.Document(docx_path)
-        for para in doc.paragraphs:
-            text += para.text + "\n"
+        for chunk in chunks:
+            parts.append(chunk)
+            total += len(chunk) + 1
+            if (max_pages and len(parts) >= max_pages) or (max_chars and total >= max_chars):
+                break
     except Exception as e:
-        print(f"Error reading DOCX: {e}")
-    return text
+        if strict:
+            raise
+        print(f"Error reading {label}: {e}")
+    finally:
+        chunks.close()   # release the file handle when stopping early
+    return "".join(part + "\n" for part in parts)
+
+
+def _iter_pypdf_pages(module, pdf):
+    """Pages of a PyPDF2 / pypdf reader, parsed only as they are consumed."""
+    if isinstance(pdf, (str, os.PathLike)):
+        with open(pdf, 'rb') as file:
+            yield from _iter_pypdf_pages(module, file)
+        return
+    reader = module.PdfReader(pdf)
+    for page in reader.pages:
+        yield page.extract_text() or ""
+
+
+def iter_pdf_pages(pdf):
+    """
+    Yield the text of each PDF page via PyPDF2, parsing pages only as they
+    are consumed.  ``pdf`` is a path or a binary stream.
+    """
+    import PyPDF2
+    return _iter_pypdf_pages(PyPDF2, pdf)
+
+
+@register_backend(".pdf", "pymupdf", "pymupdf")
+def _pdf_pymupdf(source, max_chars, max_pages):
+    import pymupdf
+
+    def pages():
+        if isinstance(source, bytes):
+            doc = pymupdf.open(stream=source, filetype="pdf")
+        else:
+            doc = pymupdf.open(source)
+        with doc:
+            for page in doc:
+                yield page.get_text()
+
+    return _join_within_budget(pages(), "PDF", max_chars, max_pages, strict=True)
+
+
+@register_backend(".pdf", "pypdf2", "PyPDF2")
+def _pdf_pypdf2(source, max_chars, max_pages):
+    return _join_within_budget(iter_pdf_pages(_stream(source)), "PDF", max_chars, max_pages, strict=True)
+
+
+@register_backend(".pdf", "pypdf", "pypdf")
+def _pdf_pypdf(source, max_chars, max_pages):
+    import pypdf
+    return _join_within_budget(_iter_pypdf_pages(pypdf, _stream(source)), "PDF", max_chars, max_pages, strict=True)
+
+
+def extract_text_from_pdf(pdf_path, max_chars=MAX_CHARS, max_pages=MAX_PAGES):
+    return _extract_as(".pdf", _payload(pdf_path), max_chars, max_pages)[0]
+
+
+# WordprocessingML tags for the streaming DOCX reader
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+_DOCX_CONTAINERS = {_W + "body", _W + "hdr", _W + "ftr"}
+# Run content that stands for a character — only as a child of ``w:r``
+# (``w:tab`` also defines tab stops under ``w:pPr/w:tabs``)
+_DOCX_SPECIAL_RUNS = {_W + "tab": "\t", _W + "br": "\n", _W + "cr": "\n"}
+_DOCX_EXTRA_PART = re.compile(r"word/(header|footer)\d*\.xml")
+
+
+def _iter_docx_part(zf, name):
+    """
+    Stream the paragraphs of one WordprocessingML part with ``iterparse``.
+
+    Every ``w:p`` counts, including those inside tables and text boxes;
+    ``mc:Fallback`` blocks (legacy duplicates of ``mc:Choice`` content) are
+    skipped.  Finished blocks are cleared so memory stays flat.
+    """
+    runs = []          # text runs of each open paragraph (text boxes nest)
+    tags = []          # tags of the open elements, innermost last
+    depth = 0
+    container, container_depth = None, 0
+    fallback_depth = 0
+
+    with zf.open(name) as fh:
+        for event, elem in ET.iterparse(fh, events=("start", "end")):
+            tag = elem.tag
+            if event == "start":
+                depth += 1
+                tags.append(tag)
+                if tag == _MC_FALLBACK:
+                    fallback_depth += 1
+                elif container is None and tag in _DOCX_CONTAINERS:
+                    container, container_depth = elem, depth
+                elif tag == _W + "p" and not fallback_depth:
+                    runs.append([])
+                continue
+
+            if tag == _MC_FALLBACK:
+                fallback_depth -= 1
+            elif not fallback_depth:
+                if tag == _W + "t":
+                    if runs:
+                        runs[-1].append(elem.text or "")
+                elif tag in _DOCX_SPECIAL_RUNS:
+                    if runs and len(tags) > 1 and tags[-2] == _W + "r":
+                        runs[-1].append(_DOCX_SPECIAL_RUNS[tag])
+                elif tag == _W + "p":
+                    yield "".join(runs.pop())
+
+            if container is not None and depth == container_depth + 1:
+                container.clear()      # a top-level block is done; drop it
+            depth -= 1
+            tags.pop()
+
+
+def iter_docx_xml_paragraphs(docx):
+    """
+    Yield DOCX paragraph texts straight from the zip: the document body
+    first, then headers and footers.  ``docx`` is a path or binary stream.
+    """
+    with zipfile.ZipFile(docx) as zf:
+        extra = sorted((n for n in zf.namelist() if _DOCX_EXTRA_PART.fullmatch(n)),
+                       key=lambda n: (n.startswith("word/footer"), n))
+        for name in ["word/document.xml"] + extra:
+            yield from _iter_docx_part(zf, name)
+
+
+def iter_docx_paragraphs(docx_path):
+    """Yield the text of each DOCX body paragraph via python-docx (path or binary stream)."""
+    import docx
+    doc = docx.Document(docx_path)
+    for para in doc.paragraphs:
+        yield para.text
+
+
+@register_backend(".docx", "docx-stream", "zipfile")
+def _docx_stream(source, max_chars, max_pages):
+    return _join_within_budget(iter_docx_xml_paragraphs(_stream(source)), "DOCX", max_chars, strict=True)
+
+
+@register_backend(".docx", "python-docx", "docx")
+def _docx_python_docx(source, max_chars, max_pages):
+    return _join_within_budget(iter_docx_paragraphs(_stream(source)), "DOCX", max_chars, strict=True)
+
+
+def extract_text_from_docx(docx_path, max_chars=MAX_CHARS):
+    """
+    Streaming reader first; python-docx if the package is not plain
+    WordprocessingML we can stream (bad zip, missing part, broken XML).
+    """
+    return _extract_as(".docx", _payload(docx_path), max_chars, None)[0]
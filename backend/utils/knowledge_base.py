@@ -0,0 +1,190 @@
+"""
+Role Knowledge Base
+===================
+Single source of truth for role data, loaded from ``utils/data/roles.json``
+(override with the ``RESUMEIQ_ROLES_FILE`` environment variable):
+
+  • categories          – UI role picker (formerly ``TARGET_ROLES``)
+  • aliases             – UI role name → scoring profile
+  • roles               – per-role ATS keywords + skill-gap skills
+  • experience/education keywords used by the scorer
+
+The JSON is compiled once into an immutable ``RoleKnowledgeBase``
+(read-only mappings, tuples and precompiled keyword matchers).
+The default instance is built at import time, so a pre-forking server that
+loads the app before forking shares it copy-on-write across workers.
+
+Hot reload: ``get_knowledge_base()`` re-checks the file's mtime at most
+every ``RELOAD_CHECK_INTERVAL`` seconds and atomically swaps in a freshly
+compiled instance when it changes.  A broken file — unreadable, invalid
+JSON, or JSON that does not match the schema (see ``validate_roles``) — is
+logged and ignored: the previous knowledge base stays active.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from functools import cached_property
+from types import MappingProxyType
+
+from utils.matcher import KeywordMatcher
+
+logger = logging.getLogger(__name__)
+
+ROLES_FILE = os.environ.get(
+    "RESUMEIQ_ROLES_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "roles.json"),
+)
+
+# Seconds between mtime checks of the roles file
+RELOAD_CHECK_INTERVAL = 5.0
+
+
+class RoleKnowledgeBase:
+    """Immutable, compiled view of the roles data file."""
+
+    def __init__(self, raw: dict, mtime: float = 0.0):
+        self.mtime = mtime
+        # Content hash of the data, part of the scorer version (cached scores
+        # computed against other role data are stale)
+        self.fingerprint = hashlib.sha256(
+            json.dumps(raw, sort_keys=True).encode()
+        ).hexdigest()[:12]
+
+        self.categories = MappingProxyType({
+            category: tuple(roles) for category, roles in raw.get("categories", {}).items()
+        })
+        self.aliases = MappingProxyType(dict(raw.get("aliases", {})))
+        self.experience_keywords = tuple(kw.lower() for kw in raw.get("experience_keywords", []))
+        self.education_keywords = tuple(kw.lower() for kw in raw.get("education_keywords", []))
+
+        roles = raw.get("roles", {})
+        self.role_keywords = MappingProxyType({
+            role: tuple(kw.lower() for kw in spec.get("keywords", [])) for role, spec in roles.items()
+        })
+        self.gap_skills = MappingProxyType({
+            role: tuple(s.upper() for s in spec.get("gap_skills", [])) for role, spec in roles.items()
+        })
+
+        # Generic keyword set for roles we have no profile for: the union of
+        # every role's keywords, frozen in a deterministic order.
+        self.fallback_keywords = tuple(sorted({
+            kw for kws in self.role_keywords.values() for kw in kws
+        }))
+
+        profile_keywords = self.experience_keywords + self.education_keywords
+        # One matcher over every role, experience and education keyword
+        self.ats_matcher = KeywordMatcher(self.fallback_keywords + profile_keywords)
+        # Smaller per-role matchers for scoring against one known role
+        self.role_matchers = MappingProxyType({
+            role: KeywordMatcher(kws + profile_keywords) for role, kws in self.role_keywords.items()
+        })
+
+    # -- lookups -------------------------------------------------------------
+
+    def resolve_role(self, name: str):
+        """Return the profile name for a role name or alias, else None."""
+        if name in self.role_keywords:
+            return name
+        return self.aliases.get(name)
+
+    def keywords_for(self, name: str) -> tuple:
+        """Role keywords, or the generic fallback set for unknown roles."""
+        role = self.resolve_role(name)
+        return self.role_keywords[role] if role else self.fallback_keywords
+
+    def gap_skills_for(self, name: str) -> tuple:
+        """Uppercase skills expected for a role (empty for unknown roles)."""
+        return self.gap_skills.get(self.resolve_role(name), ())
+
+    def all_roles(self) -> list:
+        """Every role name offered in the UI, sorted."""
+        return sorted(role for roles in self.categories.values() for role in roles)
+
+    @cached_property
+    def role_incidence(self):
+        """(roles, keyword vocabulary, role × keyword 0/1 NumPy matrix)."""
+        import numpy as np
+
+        roles = list(self.role_keywords)
+        vocab = self.fallback_keywords
+        column = {kw: j for j, kw in enumerate(vocab)}
+        matrix = np.zeros((len(roles), len(vocab)), dtype=np.int32)
+        for i, role in enumerate(roles):
+            matrix[i, [column[kw] for kw in self.role_keywords[role]]] = 1
+        matrix.setflags(write=False)
+        return roles, vocab, matrix
+
+
+# ---------------------------------------------------------------------------
+# Loading & hot reload
+# ---------------------------------------------------------------------------
+
+_lock = threading.Lock()
+
+
+def _string_list(value, where: str):
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise ValueError(f"{where} must be a list of strings")
+
+
+def validate_roles(raw) -> None:
+    """Raise ``ValueError`` unless ``raw`` has the shape ``RoleKnowledgeBase`` expects."""
+    if not isinstance(raw, dict):
+        raise ValueError("roles file must hold a JSON object")
+    for key in ("categories", "aliases", "roles"):
+        if not isinstance(raw.get(key, {}), dict):
+            raise ValueError(f"'{key}' must be an object")
+    for category, roles in raw.get("categories", {}).items():
+        _string_list(roles, f"categories[{category!r}]")
+    for alias, role in raw.get("aliases", {}).items():
+        if not isinstance(role, str):
+            raise ValueError(f"aliases[{alias!r}] must be a string")
+    for key in ("experience_keywords", "education_keywords"):
+        _string_list(raw.get(key, []), f"'{key}'")
+    for role, spec in raw.get("roles", {}).items():
+        if not isinstance(spec, dict):
+            raise ValueError(f"roles[{role!r}] must be an object")
+        _string_list(spec.get("keywords", []), f"roles[{role!r}].keywords")
+        _string_list(spec.get("gap_skills", []), f"roles[{role!r}].gap_skills")
+
+
+def load_knowledge_base(path: str = None) -> RoleKnowledgeBase:
+    """Read, validate and compile a roles file (``ROLES_FILE`` by default)."""
+    path = path or ROLES_FILE
+    mtime = os.path.getmtime(path)
+    with open(path, encoding="utf-8") as fh:
+        raw = json.load(fh)
+    validate_roles(raw)
+    return RoleKnowledgeBase(raw, mtime)
+
+
+_kb = load_knowledge_base()
+_last_check = time.monotonic()
+
+
+def reload_knowledge_base(force: bool = False) -> RoleKnowledgeBase:
+    """Recompile the knowledge base if the roles file changed (or ``force``)."""
+    global _kb, _last_check
+    with _lock:
+        _last_check = time.monotonic()
+        try:
+            if force or os.path.getmtime(ROLES_FILE) != _kb.mtime:
+                _kb = load_knowledge_base()
+                logger.info("Role knowledge base reloaded from %s", ROLES_FILE)
+        except (OSError, ValueError) as e:
+            logger.error("Could not reload role knowledge base: %s", e)
+        except Exception:
+            # Anything the schema check missed must not escape into a request
+            logger.exception("Could not compile role knowledge base from %s", ROLES_FILE)
+        return _kb
+
+
+def get_knowledge_base() -> RoleKnowledgeBase:
+    """Return the current knowledge base, picking up file changes."""
+    if time.monotonic() - _last_check >= RELOAD_CHECK_INTERVAL:
+        return reload_knowledge_base()
+    return _kb
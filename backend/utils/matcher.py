@@ -0,0 +1,149 @@
+"""
+Keyword Matcher
+===============
+Precompiled multi-keyword matcher used by the analyzer and the scorer.
+
+All keywords of a list are folded into a single trie-shaped regular
+expression, so one scan over the text reports every keyword that occurs —
+instead of compiling and running one ``\\b<kw>\\b`` search per keyword.
+
+Matching semantics are identical to ``re.search(r'\\b' + re.escape(kw) + r'\\b')``
+for every keyword, including overlapping hits ("rest api" / "api") and
+keywords that share a start position ("c" / "c++").
+"""
+
+import re
+from functools import lru_cache
+
+
+def _trie_pattern(keywords: list) -> str:
+    """Build a regex alternation factored on common prefixes."""
+    trie: dict = {}
+    for kw in keywords:
+        node = trie
+        for ch in kw:
+            node = node.setdefault(ch, {})
+        node[""] = True                      # end-of-keyword marker
+
+    def _render(node: dict) -> str:
+        branches = [re.escape(ch) + _render(child)
+                    for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # Greedy optional group: longer keywords are tried first and the
+            # engine backtracks to the shorter one if the boundary check fails.
+            return "(?:" + body + ")?"
+        return body
+
+    return _render(trie)
+
+
+class KeywordMatcher:
+    """
+    Word-boundary matcher for a fixed list of (already lowercased) keywords.
+
+    Build once, reuse for every resume.  Callers are expected to pass
+    lowercased text, exactly like the old per-keyword ``re.search`` calls.
+    With ``word_boundary=False`` keywords match as plain substrings
+    (``kw in text`` semantics).
+    """
+
+    def __init__(self, keywords, word_boundary: bool = True):
+        self.keywords = tuple(dict.fromkeys(keywords))   # dedupe, keep order
+        self.word_boundary = word_boundary
+        self._regex = None
+        # keyword -> [(shorter keyword that is a prefix of it, trailing check)]
+        self._prefixes = {}
+
+        if not self.keywords:
+            return
+
+        boundary = r"\b" if word_boundary else ""
+        self._regex = re.compile(
+            boundary + r"(?=(" + _trie_pattern(self.keywords) + r")" + boundary + r")"
+        )
+
+        for kw in self.keywords:
+            self._prefixes[kw] = [
+                (short, re.compile(re.escape(short) + boundary))
+                for short in self.keywords
+                if len(short) < len(kw) and kw.startswith(short)
+            ]
+
+    def iter_matches(self, text: str):
+        """Yield ``(keyword, start)`` for every keyword occurrence in ``text``."""
+        if self._regex is None:
+            return
+        for m in self._regex.finditer(text):
+            kw = m.group(1)
+            start = m.start()
+            yield kw, start
+            # The regex reports the longest keyword at this position; shorter
+            # keywords can only match here if they are prefixes of it.
+            for short, tail in self._prefixes[kw]:
+                if tail.match(text, start):
+                    yield short, start
+
+    def find_all(self, text: str) -> set:
+        """Return the set of keywords that occur at least once in ``text``."""
+        return {kw for kw, _ in self.iter_matches(text)}
+
+
+@lru_cache(maxsize=256)
+def get_matcher(keywords: tuple, word_boundary: bool = True) -> KeywordMatcher:
+    """Return a cached matcher for an (immutable) keyword tuple."""
+    return KeywordMatcher(keywords, word_boundary)
+
+
+class SkillIndex:
+    """
+    Index over one resume's (lowercased) skills for substring skill matching.
+
+    Replaces the nested ``any(s in rs or rs in s for rs in resume_skills)``
+    scan with:
+
+      • a hash set of the skills, for exact hits;
+      • one separator-joined haystack, so "required skill occurs inside some
+        resume skill" is a single C-level substring search;
+      • the distinct skill lengths, so "some resume skill occurs inside the
+        required skill" only probes substrings of lengths that exist.
+
+    Results are identical to the nested loops, in required-skill order.
+    """
+
+    _SEP = "\x00"
+
+    def __init__(self, skills):
+        self.skills = frozenset(skills)
+        self._haystack = self._SEP.join(self.skills)
+        self._lengths = sorted({len(s) for s in self.skills})
+
+    def contained(self, skill: str) -> bool:
+        """True if ``skill`` is a substring of (or equal to) an indexed skill."""
+        if not self.skills:
+            return False
+        if skill in self.skills:
+            return True
+        if self._SEP in skill:
+            return any(skill in s for s in self.skills)
+        return skill in self._haystack
+
+    def contains_any(self, skill: str) -> bool:
+        """True if some indexed skill is a substring of ``skill``."""
+        for n in self._lengths:
+            if n > len(skill):
+                break
+            for i in range(len(skill) - n + 1):
+                if skill[i:i + n] in self.skills:
+                    return True
+        return False
+
+    def match(self, required_skills, two_way: bool = False) -> list:
+        """
+        Required skills found among the indexed skills (exact or substring).
+        With ``two_way`` an indexed skill contained in a required skill also counts.
+        """
+        return [s for s in required_skills
+                if self.contained(s) or (two_way and self.contains_any(s))]
@@ -0,0 +1,45 @@
+"""
+Normalised Resume Text
+======================
+``ResumeText`` is the lowercased resume text, built once in ``parse_resume``
+and shared by the analyzer and the scorer.
+
+It is a ``str`` subclass, so it serialises to JSON and behaves exactly like
+the plain lowercase string previously stored in ``parsed_data["text"]``.
+Derived views (lines, word tokens, word count) are computed lazily on first
+access and cached on the instance, so no stage re-lowercases or re-splits
+the text.  Pickling (e.g. back from an extraction worker process) sends only
+the string; the receiving side gets a ``ResumeText`` and rebuilds the views
+it uses.
+"""
+
+from functools import cached_property
+
+
+class ResumeText(str):
+    """Lowercased resume text with lazily cached derived views."""
+
+    @classmethod
+    def of(cls, text) -> "ResumeText":
+        """Return ``text`` unchanged if already normalised, else lowercase it once."""
+        if isinstance(text, cls):
+            return text
+        return cls((text or "").lower())
+
+    def __reduce__(self):
+        # Just the text: the cached views are cheaper to rebuild than to ship
+        return (ResumeText, (str(self),))
+
+    @cached_property
+    def lines(self) -> list:
+        """``splitlines()`` of the text."""
+        return self.splitlines()
+
+    @cached_property
+    def tokens(self) -> list:
+        """Whitespace-separated word tokens."""
+        return self.split()
+
+    @cached_property
+    def word_count(self) -> int:
+        return len(self.tokens)
@@ -12,323 +12,124 @@ Scores start at 0 and ONLY increase based on actual matches.
 No default high-score bias.
 """
 
+import hashlib
+import json
 import re
+from functools import lru_cache
 
-# ---------------------------------------------------------------------------
-# Role knowledge base  – keywords + required skills per role
-# ---------------------------------------------------------------------------
+from utils.knowledge_base import get_knowledge_base
+from utils.matcher import KeywordMatcher, SkillIndex, get_matcher
+from utils.resume_text import ResumeText
 
-ROLE_KEYWORDS = {
-    "Frontend Developer": [
-        "html", "css", "javascript", "react", "vue", "angular", "typescript",
-        "next.js", "redux", "webpack", "sass", "less", "responsive", "ui/ux",
-        "dom", "ajax", "rest api", "git", "figma", "accessibility", "jest",
-        "tailwind", "bootstrap", "vite", "component", "hooks", "state management"
-    ],
-    "Backend Developer": [
-        "python", "java", "node.js", "express", "django", "flask", "spring",
-        "rest api", "graphql", "sql", "postgresql", "mysql", "mongodb", "redis",
-        "docker", "aws", "microservices", "authentication", "jwt", "kafka",
-        "rabbitmq", "linux", "nginx", "ci/cd", "git", "orm", "database design",
-        "data modeling", "caching", "security"
-    ],
-    "Full Stack Developer": [
-        "html", "css", "javascript", "react", "node.js", "python", "sql",
-        "mongodb", "git", "docker", "rest api", "aws", "typescript", "next.js",
-        "express", "postgresql", "redux", "authentication", "deployment",
-        "linux", "ci/cd", "microservices", "responsive design"
-    ],
-    "Software Engineer": [
-        "python", "java", "c++", "data structures", "algorithms", "system design",
-        "object oriented", "design patterns", "git", "sql", "testing", "debugging",
-        "agile", "scrum", "code review", "performance", "scalability",
-        "distributed systems", "linux", "problem solving"
-    ],
-    "Web Developer": [
-        "html", "css", "javascript", "php", "wordpress", "bootstrap", "jquery",
-        "seo", "responsive design", "git", "ftp", "cms", "mysql",
-        "web performance", "cross-browser", "accessibility", "web hosting"
-    ],
-    "Mobile App Developer": [
-        "swift", "kotlin", "react native", "flutter", "dart", "ios", "android",
-        "firebase", "xcode", "android studio", "rest api", "push notifications",
-        "app store", "play store", "mobile ui", "offline storage", "git"
-    ],
-    "Data Scientist": [
-        "python", "r", "sql", "pandas", "numpy", "scikit-learn", "tensorflow",
-        "pytorch", "statistics", "machine learning", "data visualization",
-        "tableau", "power bi", "jupyter", "big data", "matplotlib", "seaborn",
-        "hypothesis testing", "regression", "classification", "clustering",
-        "feature engineering", "data cleaning", "etl"
-    ],
-    "Machine Learning Engineer": [
-        "python", "tensorflow", "pytorch", "scikit-learn", "deep learning",
-        "neural network", "nlp", "computer vision", "mlops", "data pipeline",
-        "feature engineering", "model training", "model deployment", "aws",
-        "docker", "kubernetes", "airflow", "spark", "gpu", "cuda"
-    ],
-    "AI Engineer": [
-        "python", "deep learning", "nlp", "transformers", "llm", "bert",
-        "computer vision", "tensorflow", "pytorch", "openai", "langchain",
-        "rag", "vector database", "prompt engineering", "model fine-tuning",
-        "opencv", "hugging face", "cuda", "gpu", "reinforcement learning"
-    ],
-    "DevOps Engineer": [
-        "aws", "docker", "kubernetes", "ci/cd", "jenkins", "linux", "bash",
-        "python", "terraform", "ansible", "monitoring", "prometheus", "grafana",
-        "git", "helm", "nginx", "load balancing", "infrastructure as code",
-        "cloud", "security", "gitlab", "github actions"
-    ],
-    "Cloud Engineer": [
-        "aws", "azure", "google cloud", "terraform", "docker", "kubernetes",
-        "linux", "networking", "vpc", "iam", "s3", "ec2", "lambda",
-        "cloudwatch", "load balancer", "auto scaling", "database", "security",
-        "cost optimization", "serverless", "microservices"
-    ],
-    "Site Reliability Engineer (SRE)": [
-        "linux", "python", "go", "ansible", "terraform", "monitoring",
-        "ci/cd", "kubernetes", "prometheus", "grafana", "incident management",
-        "sla", "slo", "error budget", "on-call", "reliability",
-        "observability", "distributed systems", "performance"
-    ],
-    "Cybersecurity Analyst": [
-        "network security", "linux", "python", "siem", "firewalls", "wireshark",
-        "risk assessment", "vulnerability", "penetration testing", "ids/ips",
-        "encryption", "forensics", "compliance", "iso 27001", "nist",
-        "incident response", "threat intelligence", "zero trust", "vpn"
-    ],
-    "Penetration Tester": [
-        "kali linux", "metasploit", "burp suite", "python", "bash",
-        "network security", "ethical hacking", "oscp", "ceh", "nmap",
-        "sqlmap", "owasp", "web application", "reverse engineering",
-        "social engineering", "exploit", "ctf", "vulnerability assessment"
-    ],
-    "Blockchain Developer": [
-        "solidity", "ethereum", "smart contracts", "web3.js", "cryptography",
-        "rust", "go", "hardhat", "truffle", "defi", "nft", "consensus",
-        "hyperledger", "ipfs", "erc20", "gas optimization", "wallet"
-    ],
-    "Embedded Systems Engineer": [
-        "c", "c++", "microcontrollers", "rtos", "pcb design", "iot",
-        "firmware", "arduino", "raspberry pi", "stm32", "uart", "spi", "i2c",
-        "assembly", "debugging", "oscilloscope", "real time", "baremetal"
-    ],
-    "Game Developer": [
-        "c++", "c#", "unity", "unreal engine", "3d math", "graphics programming",
-        "opengl", "directx", "vulkan", "physics engine", "shaders", "animation",
-        "game design", "multiplayer", "networking", "optimization", "blender"
-    ],
-    "Database Administrator (DBA)": [
-        "sql", "postgresql", "mysql", "oracle", "performance tuning",
-        "backup", "recovery", "nosql", "indexing", "query optimization",
-        "replication", "sharding", "mongodb", "high availability",
-        "data modeling", "stored procedures", "triggers", "etl"
-    ],
-    "Data Engineer": [
-        "python", "sql", "apache spark", "hadoop", "kafka", "etl",
-        "data warehouse", "airflow", "aws", "azure", "google cloud",
-        "redshift", "snowflake", "bigquery", "data modeling", "pipelines",
-        "dbt", "delta lake", "data lake", "streaming", "batch processing"
-    ],
-    "QA / Automation Test Engineer": [
-        "selenium", "python", "java", "jira", "cypress", "testng", "junit",
-        "api testing", "postman", "robot framework", "cucumber", "bdd",
-        "test plan", "test cases", "regression", "performance testing",
-        "load testing", "bug tracking", "ci/cd", "git", "appium"
-    ],
-    "Network Engineer": [
-        "cisco", "tcp/ip", "routing", "switching", "vpn", "firewalls",
-        "wireshark", "bgp", "ospf", "vlan", "wan", "lan", "dns", "dhcp",
-        "network design", "troubleshooting", "ccna", "ccnp", "load balancer",
-        "sdwan", "mpls", "network security", "qos"
-    ],
-    "Systems Engineer": [
-        "linux", "windows server", "virtualization", "vmware", "bash",
-        "powershell", "active directory", "ldap", "dns", "dhcp", "networking",
-        "storage", "san", "nas", "backup", "disaster recovery",
-        "monitoring", "capacity planning", "scripting", "cloud"
-    ],
-}
-
-# Degree keywords for education scoring
-EDUCATION_KEYWORDS = [
-    "bachelor", "b.tech", "b.e", "b.sc", "bs", "undergraduate",
-    "master", "m.tech", "m.e", "m.sc", "ms", "mba",
-    "phd", "doctorate", "computer science", "information technology",
-    "electronics", "engineering", "mathematics", "statistics",
-    "degree", "university", "college", "institute of technology"
-]
-
-# Experience keywords for experience scoring
-EXPERIENCE_KEYWORDS = [
-    "experience", "work experience", "employment", "work history",
-    "developer", "engineer", "analyst", "intern", "internship",
-    "project", "built", "developed", "implemented", "designed",
-    "worked at", "company", "organization", "position", "role",
-    "years", "months", "full-time", "part-time", "freelance",
-    "led", "managed", "delivered", "collaborated", "contributed"
-]
+# Role keywords, aliases and experience/education keywords live in the
+# compiled role knowledge base (utils/data/roles.json).
 
+# Bump whenever a change to the scoring logic below changes scores: cached
+# results (see score_cache.py) from any other version are recomputed.
+SCORER_VERSION = 1
 
-# ---------------------------------------------------------------------------
-# Helper: count keyword matches in resume text
-# ---------------------------------------------------------------------------
 
-def _count_matches(text: str, keyword_list: list) -> tuple[int, list]:
-    """Return (match_count, matched_keywords) for a list of keywords."""
-    found = []
-    text_lower = text.lower()
-    for kw in keyword_list:
-        # Word boundary match – handles multi-word phrases too
-        pattern = r'\b' + re.escape(kw.lower()) + r'\b'
-        if re.search(pattern, text_lower):
-            found.append(kw)
-    return len(found), found
+def scorer_version() -> str:
+    """``SCORER_VERSION`` plus the fingerprint of the active role data."""
+    return f"{SCORER_VERSION}-{get_knowledge_base().fingerprint}"
+
+# Precompiled patterns shared by the scoring functions
+_YEAR_RE = re.compile(r'\b(\d{1,2})\s*\+?\s*(?:years?|yrs?)\b')
+_EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+_PHONE_RE = re.compile(r'(\+?\d[\d\s\-().]{7,}\d)')
+_SECTION_RE = re.compile(r'\b(experience|education|skills|projects|summary|objective)\b')
+_EXTRA_SECTION_RE = re.compile(r'\b(certifications?|achievements?|awards?)\b')
+
+def resolve_role(target_role: str):
+    """Return the scorer role for a UI role name (or alias), else None."""
+    return get_knowledge_base().resolve_role(target_role)
+
+
+# Tier tables: (minimum value, points), checked top-down.  Values below the
+# last threshold earn the ``positive`` points of _tier() if non-zero.
+KEYWORD_TIERS = [(0.70, 40), (0.50, 32), (0.35, 24), (0.20, 16), (0.10, 8)]
+SKILLS_TIERS = [(0.65, 25), (0.45, 20), (0.30, 15), (0.15, 10)]
+EXPERIENCE_TIERS = [(6, 16), (4, 12), (2, 7), (1, 3)]
+EDUCATION_TIERS = [(4, 10), (2, 7), (1, 4)]
 
 
 # ---------------------------------------------------------------------------
-# Main scoring function
+# Helpers shared by the single-resume and batch scorers
 # ---------------------------------------------------------------------------
 
-def calculate_ats_score(data: dict, target_role: str = "") -> tuple[int, dict, list]:
+def _count_matches(text: str, keyword_list: list, hits: set = None) -> tuple[int, list]:
     """
-    Calculate a dynamic ATS score (0–100) based on actual resume content
-    versus the target role's requirements.
-
-    Weights:
-      Keyword Match        : 40 pts
-      Skills Match         : 25 pts
-      Experience Relevance : 20 pts
-      Education Relevance  : 10 pts
-      Formatting Check     :  5 pts
+    Return (match_count, matched_keywords) for a list of keywords.
 
-    All scores start at 0 and grow only from actual matches.
+    ``hits`` is an optional precomputed set of keywords found in the text
+    (see ``RoleKnowledgeBase.ats_matcher``); otherwise a cached matcher for the list is used.
     """
+    if hits is None:
+        matcher = get_matcher(tuple(kw.lower() for kw in keyword_list))
+        hits = matcher.find_all(ResumeText.of(text))
+    found = [kw for kw in keyword_list if kw.lower() in hits]
+    return len(found), found
 
-    text: str = data.get("text", "")
-    resume_skills: list = [s.lower() for s in data.get("skills", [])]
-    feedback: list = []
 
-    # Resolve role keyword list (fall back to a generic common-skills list)
-    role_kws = ROLE_KEYWORDS.get(target_role, list(set(
-        kw for kws in ROLE_KEYWORDS.values() for kw in kws
-    )))
+def _match_skills(required_skills: list, resume_skills, two_way: bool = False) -> list:
+    """
+    Required skills found among the resume skills (exact or substring).
+    With ``two_way`` a resume skill contained in a required skill also counts.
+    ``resume_skills`` may be a list or a prebuilt ``SkillIndex``.
+    """
+    if not isinstance(resume_skills, SkillIndex):
+        resume_skills = SkillIndex(resume_skills)
+    return resume_skills.match(required_skills, two_way)
 
-    # ── 1. KEYWORD MATCH  (40 pts) ──────────────────────────────────────────
-    total_kws = len(role_kws)
-    matched_count, matched_kws = _count_matches(text, role_kws)
 
-    if total_kws > 0:
-        kw_ratio = matched_count / total_kws
-    else:
-        kw_ratio = 0.0
+def _tier(value, tiers: list, positive: int = 0) -> int:
+    """Points for ``value`` from a tier table (see KEYWORD_TIERS)."""
+    for threshold, points in tiers:
+        if value >= threshold:
+            return points
+    return positive if value > 0 else 0
 
-    # Tiered keyword score to avoid inflated scores from partial matches
-    if kw_ratio >= 0.70:
-        keyword_score = 40
-    elif kw_ratio >= 0.50:
-        keyword_score = 32
-    elif kw_ratio >= 0.35:
-        keyword_score = 24
-    elif kw_ratio >= 0.20:
-        keyword_score = 16
-    elif kw_ratio >= 0.10:
-        keyword_score = 8
-    elif kw_ratio > 0:
-        keyword_score = 4
-    else:
-        keyword_score = 0
 
-    if keyword_score < 20:
-        feedback.append(
-            f"Low keyword density for '{target_role}'. "
-            f"Only {matched_count}/{total_kws} role keywords found."
-        )
+def _tier_array(np, values, tiers: list, positive: int = 0):
+    """Vectorised _tier() over a NumPy array."""
+    conditions = [values >= threshold for threshold, _ in tiers] + [values > 0]
+    choices = [points for _, points in tiers] + [positive]
+    return np.select(conditions, choices, 0)
 
-    # ── 2. SKILLS MATCH  (25 pts) ───────────────────────────────────────────
-    required_skills = [s.lower() for s in ROLE_KEYWORDS.get(target_role, [])]
-    if required_skills:
-        skills_matched = [s for s in required_skills if s in resume_skills or
-                          any(s in rs for rs in resume_skills)]
-        skills_ratio = len(skills_matched) / len(required_skills)
-    else:
-        skills_matched = []
-        skills_ratio = 0.0
 
-    if skills_ratio >= 0.65:
-        skills_score = 25
-    elif skills_ratio >= 0.45:
-        skills_score = 20
-    elif skills_ratio >= 0.30:
-        skills_score = 15
-    elif skills_ratio >= 0.15:
-        skills_score = 10
-    elif skills_ratio > 0:
-        skills_score = 5
-    else:
-        skills_score = 0
+def _formatting_signals(text: ResumeText) -> tuple[int, bool, bool, int]:
+    """Return (word_count, has_email, has_phone, section_heading_groups)."""
+    has_sections = sum([
+        bool(_SECTION_RE.search(text)),
+        bool(_EXTRA_SECTION_RE.search(text)),
+    ])
+    return text.word_count, bool(_EMAIL_RE.search(text)), bool(_PHONE_RE.search(text)), has_sections
 
-    if skills_score < 15:
-        feedback.append(
-            f"Skills gap detected. Matched {len(skills_matched)}/{len(required_skills)} "
-            f"required skills for '{target_role}'."
-        )
 
-    # ── 3. EXPERIENCE RELEVANCE  (20 pts) ───────────────────────────────────
-    exp_matched, _ = _count_matches(text, EXPERIENCE_KEYWORDS)
+def _role_independent_scores(kb, text: ResumeText, hits: set) -> tuple[int, int, int, tuple]:
+    """
+    Experience (20), education (10) and formatting (5) scores, which do not
+    depend on the target role.  Returns them with the formatting signals.
+    """
+    # ── EXPERIENCE RELEVANCE ────────────────────────────────────────────────
+    exp_matched, _ = _count_matches(text, kb.experience_keywords, hits)
 
     # Count number of years/duration signals
-    year_pattern = r'\b(\d{1,2})\s*\+?\s*(?:years?|yrs?)\b'
-    year_mentions = re.findall(year_pattern, text.lower())
+    year_mentions = _YEAR_RE.findall(text)
     total_exp_years = sum(int(y) for y in year_mentions) if year_mentions else 0
 
     if exp_matched >= 8 and total_exp_years >= 2:
         experience_score = 20
-    elif exp_matched >= 6:
-        experience_score = 16
-    elif exp_matched >= 4:
-        experience_score = 12
-    elif exp_matched >= 2:
-        experience_score = 7
-    elif exp_matched >= 1:
-        experience_score = 3
-    else:
-        experience_score = 0
-
-    if experience_score < 10:
-        feedback.append(
-            "Experience section appears weak or missing. Add role titles, "
-            "companies, durations, and specific contributions."
-        )
-
-    # ── 4. EDUCATION RELEVANCE  (10 pts) ────────────────────────────────────
-    edu_matched, _ = _count_matches(text, EDUCATION_KEYWORDS)
-
-    if edu_matched >= 4:
-        education_score = 10
-    elif edu_matched >= 2:
-        education_score = 7
-    elif edu_matched >= 1:
-        education_score = 4
     else:
-        education_score = 0
+        experience_score = _tier(exp_matched, EXPERIENCE_TIERS)
 
-    if education_score == 0:
-        feedback.append(
-            "Education section not detected. Include degree, institution, "
-            "and graduation year."
-        )
-
-    # ── 5. FORMATTING CHECK  (5 pts) ────────────────────────────────────────
-    text_len = len(text.strip())
-    word_count = len(text.split())
+    # ── EDUCATION RELEVANCE ─────────────────────────────────────────────────
+    edu_matched, _ = _count_matches(text, kb.education_keywords, hits)
+    education_score = _tier(edu_matched, EDUCATION_TIERS)
 
-    has_email = bool(re.search(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', text))
-    has_phone = bool(re.search(r'(\+?\d[\d\s\-().]{7,}\d)', text))
-    has_sections = sum([
-        bool(re.search(r'\b(experience|education|skills|projects|summary|objective)\b', text.lower())),
-        bool(re.search(r'\b(certifications?|achievements?|awards?)\b', text.lower())),
-    ])
+    # ── FORMATTING CHECK ────────────────────────────────────────────────────
+    signals = _formatting_signals(text)
+    word_count, has_email, has_phone, has_sections = signals
 
     formatting_score = 0
     if 200 <= word_count <= 1200:
@@ -344,12 +145,101 @@ def calculate_ats_score(data: dict, target_role: str = "") -> tuple[int, dict, l
 
     formatting_score = min(5, formatting_score)
 
+    return experience_score, education_score, formatting_score, signals
+
+
+def _ats_feedback(target_role: str, keyword_score: int, matched_count: int, total_kws: int,
+                  skills_score: int, skills_matched: int, required_count: int,
+                  experience_score: int, education_score: int,
+                  has_email: bool, has_phone: bool, word_count: int) -> list:
+    """Build the ATS feedback messages from the computed sub-scores."""
+    feedback = []
+    if keyword_score < 20:
+        feedback.append(
+            f"Low keyword density for '{target_role}'. "
+            f"Only {matched_count}/{total_kws} role keywords found."
+        )
+    if skills_score < 15:
+        feedback.append(
+            f"Skills gap detected. Matched {skills_matched}/{required_count} "
+            f"required skills for '{target_role}'."
+        )
+    if experience_score < 10:
+        feedback.append(
+            "Experience section appears weak or missing. Add role titles, "
+            "companies, durations, and specific contributions."
+        )
+    if education_score == 0:
+        feedback.append(
+            "Education section not detected. Include degree, institution, "
+            "and graduation year."
+        )
     if not has_email or not has_phone:
         feedback.append("Contact information incomplete. Include both email and phone.")
     if word_count < 200:
         feedback.append("Resume appears too short. Aim for 400–900 words.")
     elif word_count > 1200:
         feedback.append("Resume may be too long. Keep it focused (400–900 words ideal).")
+    return feedback
+
+
+# ---------------------------------------------------------------------------
+# Main scoring function
+# ---------------------------------------------------------------------------
+
+def calculate_ats_score(data: dict, target_role: str = "") -> tuple[int, dict, list]:
+    """
+    Calculate a dynamic ATS score (0–100) based on actual resume content
+    versus the target role's requirements.
+
+    Weights:
+      Keyword Match        : 40 pts
+      Skills Match         : 25 pts
+      Experience Relevance : 20 pts
+      Education Relevance  : 10 pts
+      Formatting Check     :  5 pts
+
+    All scores start at 0 and grow only from actual matches.
+    """
+
+    text = ResumeText.of(data.get("text", ""))
+    resume_skills: list = [s.lower() for s in data.get("skills", [])]
+
+    kb = get_knowledge_base()
+    role = kb.resolve_role(target_role)
+    role_kws = kb.keywords_for(target_role)
+
+    # Single pass over the text for role, experience and education keywords
+    hits = kb.role_matchers.get(role, kb.ats_matcher).find_all(text)
+
+    # ── 1. KEYWORD MATCH  (40 pts) ──────────────────────────────────────────
+    total_kws = len(role_kws)
+    matched_count, matched_kws = _count_matches(text, role_kws, hits)
+    kw_ratio = matched_count / total_kws if total_kws > 0 else 0.0
+
+    # Tiered keyword score to avoid inflated scores from partial matches
+    keyword_score = _tier(kw_ratio, KEYWORD_TIERS, positive=4)
+
+    # ── 2. SKILLS MATCH  (25 pts) ───────────────────────────────────────────
+    required_skills = list(kb.role_keywords.get(role, ()))
+    if required_skills:
+        skills_matched = _match_skills(required_skills, resume_skills)
+        skills_ratio = len(skills_matched) / len(required_skills)
+    else:
+        skills_matched = []
+        skills_ratio = 0.0
+
+    skills_score = _tier(skills_ratio, SKILLS_TIERS, positive=5)
+
+    # ── 3–5. EXPERIENCE, EDUCATION, FORMATTING  (35 pts) ─────────────────────
+    experience_score, education_score, formatting_score, (word_count, has_email, has_phone, _) = \
+        _role_independent_scores(kb, text, hits)
+
+    feedback = _ats_feedback(
+        target_role, keyword_score, matched_count, total_kws,
+        skills_score, len(skills_matched), len(required_skills),
+        experience_score, education_score, has_email, has_phone, word_count,
+    )
 
     # ── Final Score ──────────────────────────────────────────────────────────
     total_score = (
@@ -374,31 +264,81 @@ def calculate_ats_score(data: dict, target_role: str = "") -> tuple[int, dict, l
 # Recruiter JD Match Scoring
 # ---------------------------------------------------------------------------
 
-def calculate_jd_match_score(parsed_resume: dict, jd_data: dict) -> tuple[int, dict, list]:
+class CompiledJD:
+    """
+    A job description prepared once for scoring many resumes: lowercased
+    skill lists, parsed education keywords, the experience threshold and a
+    single precompiled matcher over every skill and education keyword.
+    """
+
+    def __init__(self, jd_data: dict):
+        self.required_skills = tuple(s.lower() for s in jd_data.get("required_skills", []))
+        self.nth_skills = tuple(s.lower() for s in jd_data.get("nice_to_have_skills", []))
+        self.req_exp = jd_data.get("experience_level") or 0
+        self.req_edu = jd_data.get("education_requirement") or ""
+        self.edu_kws = tuple(kw.strip() for kw in self.req_edu.lower().split(',')) if self.req_edu else ()
+        self.matcher = KeywordMatcher(self.required_skills + self.nth_skills + self.edu_kws)
+        # Identifies the scoring inputs, not the job: two jobs with the same
+        # requirements share cached scores
+        self.fingerprint = hashlib.sha256(json.dumps(
+            [self.required_skills, self.nth_skills, self.req_exp, self.req_edu]
+        ).encode()).hexdigest()[:16]
+
+    @classmethod
+    def of(cls, jd_data) -> "CompiledJD":
+        """Return ``jd_data`` if already compiled, else compile the dict."""
+        return jd_data if isinstance(jd_data, cls) else cls(jd_data)
+
+
+@lru_cache(maxsize=128)
+def _compile_job(job_id, required_skills, nice_to_have_skills, experience_level, education_requirement):
+    return CompiledJD({
+        "required_skills": json.loads(required_skills) if required_skills else [],
+        "nice_to_have_skills": json.loads(nice_to_have_skills) if nice_to_have_skills else [],
+        "experience_level": experience_level,
+        "education_requirement": education_requirement,
+    })
+
+
+def compile_job_description(jd) -> CompiledJD:
+    """
+    ``CompiledJD`` for a ``JobDescription`` row.
+
+    Cached by job id and the scoring fields themselves, so an edited job is
+    recompiled on next use and an unchanged one is never re-parsed.
+    """
+    return _compile_job(jd.id, jd.required_skills, jd.nice_to_have_skills,
+                        jd.experience_level, jd.education_requirement)
+
+
+def calculate_jd_match_score(parsed_resume: dict, jd_data) -> tuple[int, dict, list]:
     """
     Calculate a JD matching score (0-100) specifically for Recruiter flow.
+    ``jd_data`` is a JD dict or a prebuilt ``CompiledJD``.
     Weights:
       Required Skills : 50 pts
       Experience      : 20 pts
       Education       : 15 pts
       Nice-to-Have    : 15 pts
     """
-    text: str = parsed_resume.get("text", "")
-    resume_skills: list = [s.lower() for s in parsed_resume.get("skills", [])]
+    text = ResumeText.of(parsed_resume.get("text", ""))
+    resume_skills = SkillIndex(s.lower() for s in parsed_resume.get("skills", []))
     feedback: list = []
     
     # JD requirements
-    required_skills = [s.lower() for s in jd_data.get("required_skills", [])]
-    nth_skills = [s.lower() for s in jd_data.get("nice_to_have_skills", [])]
-    req_exp = jd_data.get("experience_level") or 0
-    req_edu = jd_data.get("education_requirement") or ""
+    jd = CompiledJD.of(jd_data)
+    required_skills = jd.required_skills
+    nth_skills = jd.nth_skills
+    req_exp = jd.req_exp
+    req_edu = jd.req_edu
+    hits = jd.matcher.find_all(text)
 
     # 1. Required Skills Match (50 points)
     if required_skills:
-        skills_matched = [s for s in required_skills if s in resume_skills or any((s in rs or rs in s) for rs in resume_skills)]
+        skills_matched = _match_skills(required_skills, resume_skills, two_way=True)
         if not skills_matched:
             # Try text search fallback
-            _, txt_matched = _count_matches(text, required_skills)
+            _, txt_matched = _count_matches(text, required_skills, hits)
             skills_matched.extend(txt_matched)
             
         skills_matched = list(set(skills_matched))
@@ -411,8 +351,7 @@ def calculate_jd_match_score(parsed_resume: dict, jd_data: dict) -> tuple[int, d
         feedback.append(f"Missing core required skills. Only matched {len(skills_matched)} out of {len(required_skills)}.")
         
     # 2. Experience Match (20 points)
-    year_pattern = r'\b(\d{1,2})\s*\+?\s*(?:years?|yrs?)\b'
-    year_mentions = re.findall(year_pattern, text.lower())
+    year_mentions = _YEAR_RE.findall(text)
     
     # Naive extraction - max mentioned years
     total_exp_years = max([int(y) for y in year_mentions]) if year_mentions else 0
@@ -431,8 +370,7 @@ def calculate_jd_match_score(parsed_resume: dict, jd_data: dict) -> tuple[int, d
         
     # 3. Education Match (15 points)
     if req_edu:
-        edu_kws = [kw.strip() for kw in req_edu.lower().split(',')]
-        matched_edu, _ = _count_matches(text, edu_kws)
+        matched_edu, _ = _count_matches(text, jd.edu_kws, hits)
         if matched_edu > 0:
             edu_score = 15
         else:
@@ -443,9 +381,9 @@ def calculate_jd_match_score(parsed_resume: dict, jd_data: dict) -> tuple[int, d
         
     # 4. Nice-to-Have Skills (15 points)
     if nth_skills:
-        nth_matched = [s for s in nth_skills if s in resume_skills or any((s in rs or rs in s) for rs in resume_skills)]
+        nth_matched = _match_skills(nth_skills, resume_skills, two_way=True)
         if not nth_matched:
-            _, txt_matched = _count_matches(text, nth_skills)
+            _, txt_matched = _count_matches(text, nth_skills, hits)
             nth_matched.extend(txt_matched)
             
         nth_matched = list(set(nth_matched))
@@ -467,97 +405,245 @@ def calculate_jd_match_score(parsed_resume: dict, jd_data: dict) -> tuple[int, d
 
 
 # ---------------------------------------------------------------------------
-# Recruiter JD Match Scoring
+# Multi-role scoring (best-fit role recommendations)
 # ---------------------------------------------------------------------------
 
-def calculate_jd_match_score(parsed_resume: dict, jd_data: dict) -> tuple[int, dict, list]:
+def score_all_roles(data: dict) -> list[tuple[str, int]]:
     """
-    Calculate a JD matching score (0-100) specifically for Recruiter flow.
-    Weights:
-      Required Skills : 50 pts
-      Experience      : 20 pts
-      Education       : 15 pts
-      Nice-to-Have    : 15 pts
+    Score one parsed resume against every role in the knowledge base.
+
+    The resume is scanned once; per-role keyword and skill matches are a
+    single matrix-vector product against the role × keyword incidence
+    matrix.  Experience, education and formatting do not depend on the role
+    and are computed once.  Each score equals ``calculate_ats_score(data,
+    role)[0]``.  Returns ``[(role, score), ...]`` best fit first.
     """
-    text: str = parsed_resume.get("text", "")
-    resume_skills: list = [s.lower() for s in parsed_resume.get("skills", [])]
-    feedback: list = []
-    
-    # JD requirements
-    required_skills = [s.lower() for s in jd_data.get("required_skills", [])]
-    nth_skills = [s.lower() for s in jd_data.get("nice_to_have_skills", [])]
-    req_exp = jd_data.get("experience_level") or 0
-    req_edu = jd_data.get("education_requirement") or ""
+    kb = get_knowledge_base()
+    text = ResumeText.of(data.get("text", ""))
+    resume_skills = SkillIndex(s.lower() for s in data.get("skills", []))
+    hits = kb.ats_matcher.find_all(text)
+    base_score = sum(_role_independent_scores(kb, text, hits)[:3])
+
+    try:
+        import numpy as np
+    except ImportError:
+        scores = []
+        for role, kws in kb.role_keywords.items():
+            size = len(kws) or 1
+            keyword_score = _tier(_count_matches(text, kws, hits)[0] / size, KEYWORD_TIERS, positive=4)
+            skills_score = _tier(len(_match_skills(kws, resume_skills)) / size, SKILLS_TIERS, positive=5)
+            scores.append((role, int(min(100, keyword_score + skills_score + base_score))))
+    else:
+        roles, vocab, matrix = kb.role_incidence
+        skill_hits = set(_match_skills(vocab, resume_skills))
+        keyword_vec = np.fromiter((kw in hits for kw in vocab), dtype=np.int32, count=len(vocab))
+        skill_vec = np.fromiter((kw in skill_hits for kw in vocab), dtype=np.int32, count=len(vocab))
 
-    # 1. Required Skills Match (50 points)
+        role_sizes = np.maximum(matrix.sum(axis=1), 1)
+        keyword_score = _tier_array(np, (matrix @ keyword_vec) / role_sizes, KEYWORD_TIERS, positive=4)
+        skills_score = _tier_array(np, (matrix @ skill_vec) / role_sizes, SKILLS_TIERS, positive=5)
+        totals = np.minimum(100, keyword_score + skills_score + base_score)
+        scores = [(role, int(total)) for role, total in zip(roles, totals)]
+
+    return sorted(scores, key=lambda item: -item[1])
+
+
+# ---------------------------------------------------------------------------
+# Batch scoring (bulk recruiter uploads)
+# ---------------------------------------------------------------------------
+
+def _presence_matrix(np, texts: list, matcher: KeywordMatcher):
+    """resume × keyword boolean matrix, one matcher pass per resume."""
+    column = {kw: j for j, kw in enumerate(matcher.keywords)}
+    matrix = np.zeros((len(texts), len(column)), dtype=bool)
+    for i, text in enumerate(texts):
+        cols = [column[kw] for kw in matcher.find_all(text)]
+        matrix[i, cols] = True
+    return matrix, column
+
+
+def calculate_ats_score_batch(parsed_list: list, target_role: str = "") -> list:
+    """
+    Score many parsed resumes against one role.
+
+    Builds a resume × keyword presence matrix in one pass per resume and
+    computes every tiered sub-score with array operations.  Returns the same
+    ``(score, breakdown, feedback)`` tuples, in order, as calling
+    ``calculate_ats_score`` on each resume.  Falls back to the per-resume
+    scorer when NumPy is not installed.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return [calculate_ats_score(data, target_role) for data in parsed_list]
+
+    if not parsed_list:
+        return []
+
+    kb = get_knowledge_base()
+    texts = [ResumeText.of(data.get("text", "")) for data in parsed_list]
+    presence, column = _presence_matrix(np, texts, kb.ats_matcher)
+
+    # ── 1. Keyword match ────────────────────────────────────────────────────
+    role_kws = kb.keywords_for(target_role)
+    total_kws = len(role_kws)
+    matched_count = presence[:, [column[kw] for kw in role_kws]].sum(axis=1)
+    kw_ratio = matched_count / total_kws if total_kws > 0 else np.zeros(len(texts))
+    keyword_score = _tier_array(np, kw_ratio, KEYWORD_TIERS, positive=4)
+
+    # ── 2. Skills match ─────────────────────────────────────────────────────
+    required_skills = list(kb.role_keywords.get(kb.resolve_role(target_role), ()))
+    skills_matched = np.array([
+        len(_match_skills(required_skills, [s.lower() for s in data.get("skills", [])]))
+        for data in parsed_list
+    ])
     if required_skills:
-        skills_matched = [s for s in required_skills if s in resume_skills or any((s in rs or rs in s) for rs in resume_skills)]
-        if not skills_matched:
-            # Try text search fallback
-            _, txt_matched = _count_matches(text, required_skills)
-            skills_matched.extend(txt_matched)
-            
-        skills_matched = list(set(skills_matched))
-        skills_ratio = len(skills_matched) / len(required_skills)
-        skills_score = int(skills_ratio * 50)
+        skills_ratio = skills_matched / len(required_skills)
     else:
-        skills_score = 50 # If none required, give full points
+        skills_ratio = np.zeros(len(texts))
+    skills_score = _tier_array(np, skills_ratio, SKILLS_TIERS, positive=5)
+
+    # ── 3. Experience ───────────────────────────────────────────────────────
+    exp_matched = presence[:, [column[kw] for kw in kb.experience_keywords]].sum(axis=1)
+    exp_years = np.array([sum(int(y) for y in _YEAR_RE.findall(t)) for t in texts])
+    experience_score = np.where(
+        (exp_matched >= 8) & (exp_years >= 2), 20,
+        _tier_array(np, exp_matched, EXPERIENCE_TIERS),
+    )
 
-    if skills_score < 25:
-        feedback.append(f"Missing core required skills. Only matched {len(skills_matched)} out of {len(required_skills)}.")
-        
-    # 2. Experience Match (20 points)
-    year_pattern = r'\b(\d{1,2})\s*\+?\s*(?:years?|yrs?)\b'
-    year_mentions = re.findall(year_pattern, text.lower())
-    
-    # Naive extraction - max mentioned years
-    total_exp_years = max([int(y) for y in year_mentions]) if year_mentions else 0
-    
+    # ── 4. Education ────────────────────────────────────────────────────────
+    edu_matched = presence[:, [column[kw] for kw in kb.education_keywords]].sum(axis=1)
+    education_score = _tier_array(np, edu_matched, EDUCATION_TIERS)
+
+    # ── 5. Formatting ───────────────────────────────────────────────────────
+    signals = [_formatting_signals(t) for t in texts]
+    word_count = np.array([sig[0] for sig in signals])
+    has_email = np.array([sig[1] for sig in signals], dtype=bool)
+    has_phone = np.array([sig[2] for sig in signals], dtype=bool)
+    has_sections = np.array([sig[3] for sig in signals])
+
+    formatting_score = (
+        np.where((word_count >= 200) & (word_count <= 1200), 2, np.where(word_count > 0, 1, 0))
+        + np.where(has_email & has_phone, 2, np.where(has_email | has_phone, 1, 0))
+        + (has_sections >= 2)
+    )
+    formatting_score = np.minimum(5, formatting_score)
+
+    totals = np.minimum(
+        100, keyword_score + skills_score + experience_score + education_score + formatting_score
+    )
+
+    results = []
+    for i in range(len(texts)):
+        breakdown = {
+            "Keyword Match": int(keyword_score[i]),
+            "Skills Match": int(skills_score[i]),
+            "Experience": int(experience_score[i]),
+            "Education": int(education_score[i]),
+            "Formatting": int(formatting_score[i]),
+        }
+        feedback = _ats_feedback(
+            target_role, breakdown["Keyword Match"], int(matched_count[i]), total_kws,
+            breakdown["Skills Match"], int(skills_matched[i]), len(required_skills),
+            breakdown["Experience"], breakdown["Education"],
+            bool(has_email[i]), bool(has_phone[i]), int(word_count[i]),
+        )
+        results.append((int(totals[i]), breakdown, feedback))
+    return results
+
+
+def calculate_jd_match_score_batch(parsed_list: list, jd_data) -> list:
+    """
+    Score many parsed resumes against one job description.
+
+    Vectorised counterpart of ``calculate_jd_match_score``: one keyword pass
+    per resume over all JD skills and education keywords, then array maths
+    for every sub-score.  Returns the same ``(score, breakdown, feedback)``
+    tuples, in order.  Falls back to the per-resume scorer without NumPy.
+    ``jd_data`` is a JD dict or a prebuilt ``CompiledJD``.
+    """
+    jd = CompiledJD.of(jd_data)
+    try:
+        import numpy as np
+    except ImportError:
+        return [calculate_jd_match_score(data, jd) for data in parsed_list]
+
+    if not parsed_list:
+        return []
+
+    n = len(parsed_list)
+    texts = [ResumeText.of(data.get("text", "")) for data in parsed_list]
+    resume_skills = [SkillIndex(s.lower() for s in data.get("skills", [])) for data in parsed_list]
+
+    required_skills = jd.required_skills
+    nth_skills = jd.nth_skills
+    req_exp = jd.req_exp
+    req_edu = jd.req_edu
+    edu_kws = jd.edu_kws
+
+    presence, column = _presence_matrix(np, texts, jd.matcher)
+
+    def _skill_ratio(skills: list):
+        """Unique matched-skill counts (resume skills first, text fallback)."""
+        unique = list(dict.fromkeys(skills))
+        via_skills = np.zeros((n, len(unique)), dtype=bool)
+        for i, rs in enumerate(resume_skills):
+            found = set(_match_skills(unique, rs, two_way=True))
+            via_skills[i] = [s in found for s in unique]
+        via_text = presence[:, [column[s] for s in unique]]
+        none_found = ~via_skills.any(axis=1)
+        matched = np.where(none_found[:, None], via_text, via_skills).sum(axis=1)
+        return matched, matched / len(skills)
+
+    # 1. Required skills (50 pts)
+    if required_skills:
+        skills_matched, skills_ratio = _skill_ratio(required_skills)
+        skills_score = (skills_ratio * 50).astype(int)
+    else:
+        skills_matched = np.zeros(n, dtype=int)
+        skills_score = np.full(n, 50)
+
+    # 2. Experience (20 pts)
+    exp_years = np.array([max((int(y) for y in _YEAR_RE.findall(t)), default=0) for t in texts])
     if req_exp > 0:
-        if total_exp_years >= req_exp:
-            exp_score = 20
-        elif total_exp_years > 0:
-            exp_ratio = total_exp_years / req_exp
-            exp_score = int(exp_ratio * 20)
-        else:
-            exp_score = 0
-            feedback.append(f"Could not verify {req_exp}+ years of experience.")
+        exp_score = np.where(
+            exp_years >= req_exp, 20,
+            np.where(exp_years > 0, (exp_years / req_exp * 20).astype(int), 0),
+        )
     else:
-        exp_score = 20
-        
-    # 3. Education Match (15 points)
+        exp_score = np.full(n, 20)
+
+    # 3. Education (15 pts)
     if req_edu:
-        edu_kws = [kw.strip() for kw in req_edu.lower().split(',')]
-        matched_edu, _ = _count_matches(text, edu_kws)
-        if matched_edu > 0:
-            edu_score = 15
-        else:
-            edu_score = 0
-            feedback.append(f"Did not find specific education requirement: {req_edu}.")
+        edu_found = presence[:, [column[kw] for kw in edu_kws]].any(axis=1)
+        edu_score = np.where(edu_found, 15, 0)
     else:
-        edu_score = 15
-        
-    # 4. Nice-to-Have Skills (15 points)
+        edu_score = np.full(n, 15)
+
+    # 4. Nice-to-have skills (15 pts)
     if nth_skills:
-        nth_matched = [s for s in nth_skills if s in resume_skills or any((s in rs or rs in s) for rs in resume_skills)]
-        if not nth_matched:
-            _, txt_matched = _count_matches(text, nth_skills)
-            nth_matched.extend(txt_matched)
-            
-        nth_matched = list(set(nth_matched))
-        nth_ratio = len(nth_matched) / len(nth_skills)
-        nth_score = int(nth_ratio * 15)
+        _, nth_ratio = _skill_ratio(nth_skills)
+        nth_score = (nth_ratio * 15).astype(int)
     else:
-        nth_score = 15
-        
-    total_score = skills_score + exp_score + edu_score + nth_score
-    
-    breakdown = {
-        "Required Skills": skills_score,
-        "Experience": exp_score,
-        "Education": edu_score,
-        "Nice-to-Have": nth_score
-    }
-    
-    return int(min(100, total_score)), breakdown, feedback
+        nth_score = np.full(n, 15)
+
+    totals = np.minimum(100, skills_score + exp_score + edu_score + nth_score)
+
+    results = []
+    for i in range(n):
+        feedback = []
+        if skills_score[i] < 25:
+            feedback.append(f"Missing core required skills. Only matched {int(skills_matched[i])} out of {len(required_skills)}.")
+        if req_exp > 0 and exp_years[i] <= 0:
+            feedback.append(f"Could not verify {req_exp}+ years of experience.")
+        if req_edu and edu_score[i] == 0:
+            feedback.append(f"Did not find specific education requirement: {req_edu}.")
 
+        breakdown = {
+            "Required Skills": int(skills_score[i]),
+            "Experience": int(exp_score[i]),
+            "Education": int(edu_score[i]),
+            "Nice-to-Have": int(nth_score[i]),
+        }
+        results.append((int(totals[i]), breakdown, feedback))
+    return results
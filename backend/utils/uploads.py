@@ -0,0 +1,164 @@
+"""
+In-memory Uploads
+=================
+Uploaded resumes are read once into memory while their SHA-256 and size are
+computed, then handed to the extractor as bytes.  Nothing is written to the
+upload folder until the caller decides to keep the file: ``persist_upload``
+is a separate step that by default runs on a background writer thread, so a
+slow (network-mounted) upload volume never sits on the request path.
+Callers that store the file name in the database pick it with
+``upload_name`` and start the write once that row is committed (see the
+``on_commit`` argument of ``BatchWriter.add``); a failed write is logged.
+
+``ingest_uploads`` is the one entry point every upload route uses to turn
+uploads into text + parsed data: it consults the raw-bytes extraction cache
+first and only extracts (once per distinct file) what it has not seen.
+Extraction and ``parse_resume`` run together in the sandboxed worker pool,
+so a batch is spread over every worker process.
+"""
+
+import copy
+import hashlib
+import os
+import secrets
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.analyzer import parse_resume
+from utils.extraction_cache import extraction_cache
+from utils.extractor import MAX_CHARS, MAX_PAGES, extract_with_backend, run_jobs
+
+CHUNK_SIZE = 64 * 1024
+
+_writer = ThreadPoolExecutor(max_workers=2, thread_name_prefix="upload-writer")
+
+
+IngestedResume = namedtuple("IngestedResume", ["ok", "text", "parsed", "error", "cached"])
+
+
+class UploadedResume:
+    """An uploaded file held in memory, with its size and raw-bytes SHA-256."""
+
+    def __init__(self, filename: str, data: bytes, sha256: str):
+        self.filename = filename
+        self.data = data
+        self.sha256 = sha256
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+    @property
+    def extension(self) -> str:
+        return os.path.splitext(self.filename)[1].lower()
+
+
+def read_upload(file) -> UploadedResume:
+    """
+    Read a Werkzeug ``FileStorage`` (or any binary file-like object with a
+    ``filename``) into memory, hashing it chunk by chunk as it streams in.
+    """
+    digest = hashlib.sha256()
+    buffer = bytearray()
+    stream = getattr(file, "stream", file)
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+        buffer += chunk
+    return UploadedResume(file.filename, bytes(buffer), digest.hexdigest())
+
+
+def _write(path: str, data: bytes):
+    try:
+        with open(path, "wb") as fh:
+            fh.write(data)
+    except Exception as e:
+        # Runs on the writer thread: nobody else will see this exception
+        print(f"Error saving upload {path}: {e} (its Resume.filepath now points at a missing file)")
+
+
+def upload_name(upload: UploadedResume) -> str:
+    """A random safe file name for ``upload`` (the value stored in ``Resume.filepath``)."""
+    return secrets.token_hex(8) + '_' + upload.filename
+
+
+def persist_upload(upload: UploadedResume, folder: str, defer: bool = True, name: str = None) -> str:
+    """
+    Save ``upload`` into ``folder`` under ``name`` (default: a fresh
+    ``upload_name``) and return that name.  With ``defer`` the write happens
+    on a background thread.
+    """
+    safe_name = name or upload_name(upload)
+    path = os.path.join(folder, safe_name)
+    if defer:
+        _writer.submit(_write, path, upload.data)
+    else:
+        _write(path, upload.data)
+    return safe_name
+
+
+def extract_and_parse(source, max_chars, max_pages, filename):
+    """
+    Worker job: extract ``source`` and run ``parse_resume`` on the text.
+    Returns ``(text, parsed, parse_error)``; extraction errors raise.
+    """
+    text, backend = extract_with_backend(source, max_chars, max_pages, filename)
+    try:
+        parsed = parse_resume(text)
+    except Exception as e:
+        return text, None, str(e)
+    parsed["extractor"] = backend          # recorded with the analysis details
+    return text, parsed, None
+
+
+def ingest_uploads(uploads: list) -> list:
+    """
+    Extract and parse uploads, returning one ``IngestedResume`` per upload
+    in order.  Cache hits skip extraction and parsing; byte-identical files
+    within the batch are extracted once.  ``parsed`` is a deep copy per
+    upload, so callers may modify it (nested lists included) without
+    touching the cached entry.
+    """
+    found = {}     # sha256 -> CachedExtraction
+    pending = {}   # sha256 -> upload to extract
+    for upload in uploads:
+        if upload.sha256 in found or upload.sha256 in pending:
+            continue
+        entry = extraction_cache.get(upload.sha256)
+        if entry is not None:
+            found[upload.sha256] = entry
+        else:
+            pending[upload.sha256] = upload
+
+    errors = {}
+    todo = list(pending.values())
+    # Extraction and parsing both run in the sandboxed pool, one job per file
+    jobs = run_jobs("utils.uploads:extract_and_parse",
+                    [(u.data, MAX_CHARS, MAX_PAGES, u.filename) for u in todo])
+    for upload, job in zip(todo, jobs):
+        if not job.ok:
+            errors[upload.sha256] = f"extraction failed ({job.error})"
+            continue
+        text, parsed, parse_error = job.value
+        if parse_error is not None:
+            errors[upload.sha256] = f"parsing failed ({parse_error})"
+            continue
+        extraction_cache.put(upload.sha256, text, parsed)
+        found[upload.sha256] = (text, parsed)
+
+    results = []
+    for upload in uploads:
+        if upload.sha256 in errors:
+            results.append(IngestedResume(False, "", None, errors[upload.sha256], False))
+        else:
+            text, parsed = found[upload.sha256]
+            results.append(IngestedResume(True, text, _copy_parsed(parsed), None, upload.sha256 not in pending))
+    return results
+
+
+def _copy_parsed(parsed: dict) -> dict:
+    """Deep copy of a parse result; the (immutable) ``text`` string is shared."""
+    text = parsed.get("text")
+    return copy.deepcopy(parsed, {id(text): text})
@@ -0,0 +1,224 @@
+"""
+Sandboxed Worker Pool
+=====================
+A bounded pool of long-lived worker processes for CPU-bound work on
+untrusted input (PDF/DOCX parsing), kept out of the Flask request threads.
+
+Every job gets:
+  • a wall-clock timeout – an overrunning worker is killed and replaced;
+  • an ``RLIMIT_AS`` memory cap, applied inside the worker;
+  • a fresh worker after ``max_jobs`` jobs, so leaks cannot accumulate.
+
+Failures never raise into the caller: ``run()`` returns a ``JobResult`` with
+``ok=False`` and ``error`` set to "timeout", "crashed", "memory limit
+exceeded" or the exception text.
+
+Workers are plain ``python -m utils.worker_pool`` subprocesses that talk to
+the parent over two inherited pipes.  Unlike multiprocessing's spawn start
+method they never re-import the parent's ``__main__`` (``run.py`` builds the
+Flask app at import time).  POSIX only — ``available()`` is False elsewhere
+and callers run the work in-process instead.
+"""
+
+import atexit
+import importlib
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Connection
+
+try:
+    import resource
+except ImportError:            # Windows
+    resource = None
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+JobResult = namedtuple("JobResult", ["ok", "value", "error", "elapsed"])
+
+
+def available() -> bool:
+    """True if sandboxed workers can run on this platform."""
+    return os.name == "posix"
+
+
+def _resolve(target: str):
+    """Import ``"package.module:function"``."""
+    module, _, name = target.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def run_inline(target: str, *args) -> JobResult:
+    """
+    Run a job in the calling thread (no sandbox) with the same error
+    reporting as ``WorkerPool.run`` — the fallback when no pool is available.
+    """
+    start = time.monotonic()
+    try:
+        value = _resolve(target)(*args)
+    except Exception as e:
+        return JobResult(False, None, f"{type(e).__name__}: {e}", time.monotonic() - start)
+    return JobResult(True, value, None, time.monotonic() - start)
+
+
+# ---------------------------------------------------------------------------
+# Parent side
+# ---------------------------------------------------------------------------
+
+class _Worker:
+    """One worker subprocess and its job/result pipes."""
+
+    def __init__(self, memory_limit_mb: int):
+        job_r, job_w = os.pipe()
+        res_r, res_w = os.pipe()
+        try:
+            self.proc = subprocess.Popen(
+                [sys.executable, "-m", "utils.worker_pool", str(job_r), str(res_w), str(memory_limit_mb)],
+                pass_fds=(job_r, res_w),
+                cwd=BACKEND_DIR,
+                stdin=subprocess.DEVNULL,
+            )
+        finally:
+            os.close(job_r)
+            os.close(res_w)
+        self.jobs = Connection(job_w, readable=False)
+        self.results = Connection(res_r, writable=False)
+        self.jobs_done = 0
+
+    def run(self, target: str, args: tuple, timeout: float):
+        """Return ``(alive, JobResult)`` for one job."""
+        start = time.monotonic()
+        try:
+            self.jobs.send((target, args))
+            if not self.results.poll(timeout):
+                return False, JobResult(False, None, "timeout", time.monotonic() - start)
+            ok, value, error = self.results.recv()
+        except (EOFError, OSError):
+            return False, JobResult(False, None, "crashed", time.monotonic() - start)
+        self.jobs_done += 1
+        alive = error != "memory limit exceeded"
+        return alive, JobResult(ok, value, error, time.monotonic() - start)
+
+    def close(self):
+        for conn in (self.jobs, self.results):
+            try:
+                conn.close()
+            except OSError:
+                pass
+        if self.proc.poll() is None:
+            self.proc.kill()
+        self.proc.wait()
+
+
+class WorkerPool:
+    """
+    Thread-safe pool of at most ``size`` sandboxed workers.
+
+    Workers are started lazily and reused; ``run()`` blocks while all of
+    them are busy.
+    """
+
+    def __init__(self, size: int, timeout: float = 30.0,
+                 memory_limit_mb: int = 512, max_jobs: int = 100):
+        self.size = size
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.max_jobs = max_jobs
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()
+        self._closed = False
+
+    def run(self, target: str, *args, timeout: float = None) -> JobResult:
+        """Run ``target(*args)`` (``"module:function"``) in a worker."""
+        with self._slots:
+            if self._closed:
+                return JobResult(False, None, "pool closed", 0.0)
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                try:
+                    worker = _Worker(self.memory_limit_mb)
+                except OSError as e:
+                    return JobResult(False, None, f"could not start worker: {e}", 0.0)
+
+            alive, result = worker.run(target, args, timeout or self.timeout)
+            if alive and worker.jobs_done < self.max_jobs and not self._closed:
+                self._idle.put(worker)
+            else:
+                worker.close()
+            return result
+
+    def map(self, target: str, arg_tuples: list, timeout: float = None) -> list:
+        """Run one job per argument tuple in parallel; results keep input order."""
+        arg_tuples = list(arg_tuples)
+        if len(arg_tuples) <= 1:
+            return [self.run(target, *args, timeout=timeout) for args in arg_tuples]
+        with ThreadPoolExecutor(max_workers=min(self.size, len(arg_tuples))) as executor:
+            return list(executor.map(lambda args: self.run(target, *args, timeout=timeout), arg_tuples))
+
+    def close(self):
+        """Stop every idle worker; busy ones are stopped when their job ends."""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pools: dict = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name: str, **options) -> WorkerPool:
+    """Process-wide named pool, created on first use with ``options``."""
+    with _pools_lock:
+        if name not in _pools:
+            _pools[name] = WorkerPool(**options)
+        return _pools[name]
+
+
+@atexit.register
+def _close_pools():
+    for pool in _pools.values():
+        pool.close()
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+def _serve(job_fd: int, result_fd: int, memory_limit_mb: int):
+    if memory_limit_mb and resource is not None:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    jobs = Connection(job_fd, writable=False)
+    results = Connection(result_fd, readable=False)
+    functions = {}
+
+    while True:
+        try:
+            target, args = jobs.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            if target not in functions:
+                functions[target] = _resolve(target)
+            results.send((True, functions[target](*args), None))
+        except MemoryError:
+            # The heap may be fragmented past the cap; report and exit so the
+            # parent replaces this worker.
+            results.send((False, None, "memory limit exceeded"))
+            return
+        except Exception as e:
+            results.send((False, None, f"{type(e).__name__}: {e}"))
+
+
+if __name__ == "__main__":
+    _serve(int(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3]))
@@ -0,0 +1,31 @@
+"""
+Entry point for the ResumeIQ upload worker.
+
+Processes the upload job queue (see jobs.py) next to the web server:
+    python backend/worker.py            # run until interrupted
+    python backend/worker.py --once     # drain the queue, then exit
+
+Start as many worker processes as you like; they share the queue safely.
+"""
+import argparse
+import sys
+import os
+
+# Make sure Python can find the server package regardless of CWD
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from jobs import JOB_POLL_INTERVAL, run_worker
+
+app = create_app()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Process queued resume uploads.")
+    parser.add_argument("--once", action="store_true", help="exit when the queue is empty")
+    parser.add_argument("--poll", type=float, default=JOB_POLL_INTERVAL,
+                        help="seconds to wait between polls of an empty queue")
+    args = parser.parse_args()
+    try:
+        run_worker(app, poll_interval=args.poll, once=args.once)
+    except KeyboardInterrupt:
+        pass
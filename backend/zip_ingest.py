@@ -0,0 +1,192 @@
+"""
+ZIP Ingestion
+=============
+Imports a ZIP archive of resumes (PDF / DOCX) as applicants of a job.
+Members are read straight out of the archive with ``zipfile`` — nothing is
+unpacked to disk — and go through the bulk pipeline (``bulk_ingest``)
+``ZIP_SLICE`` files at a time, so memory stays at about one slice of
+members however large the archive is.  Each slice is committed before the
+next one is read, together with the members' ``BatchItem`` states (see
+batches.py): sending the same archive again for the same job resumes the
+import, skipping members that are already in.
+
+Members are skipped, not imported, when they are
+
+  • directories, macOS metadata (``__MACOSX/``, ``._*``) or other files
+    that are not ``.pdf`` / ``.docx``;
+  • encrypted;
+  • larger than ``ZIP_MAX_MEMBER_BYTES`` uncompressed (the 5MB bulk limit);
+  • compressed more than ``ZIP_MAX_RATIO`` : 1 — resumes barely compress,
+    so a higher ratio is taken for a zip bomb;
+  • copies of a file earlier in the archive.
+
+Members that cannot be read — corrupt (bad CRC, sizes that do not match
+the header, ...) or using a compression method this Python lacks — are
+reported as failed; the rest of the archive is still imported.
+
+Archives with more than ``ZIP_MAX_MEMBERS`` entries are refused outright
+(``ZipRejected``).  Used by ``POST /admin/api/jobs/<id>/resumes/zip`` and
+``scripts/import_zip.py``.
+"""
+
+import hashlib
+import os
+import posixpath
+import zipfile
+import zlib
+from collections import namedtuple
+
+from batch_writer import BatchWriter
+from batches import BatchTracker
+from bulk_ingest import ingest_batch, store_applicants
+from score_cache import jd_target
+from utils.extractor import EXTRACT_WORKERS
+from utils.scorer import calculate_jd_match_score_batch
+from utils.uploads import CHUNK_SIZE, UploadedResume
+
+ZIP_MAX_MEMBERS = int(os.environ.get("ZIP_MAX_MEMBERS", 10000))
+ZIP_MAX_MEMBER_BYTES = int(os.environ.get("ZIP_MAX_MEMBER_BYTES", 5 * 1024 * 1024))
+ZIP_MAX_RATIO = float(os.environ.get("ZIP_MAX_RATIO", 100))
+ZIP_SLICE = int(os.environ.get("ZIP_SLICE", max(1, EXTRACT_WORKERS) * 4))
+
+RESUME_EXTENSIONS = ('.pdf', '.docx')
+
+# A member is an upload to ingest, a reason it was skipped or a read error
+ZipMember = namedtuple("ZipMember", ["name", "upload", "skipped", "error"])
+
+
+class ZipRejected(Exception):
+    """The archive as a whole cannot be imported."""
+
+
+def open_archive(source) -> zipfile.ZipFile:
+    """Open ``source`` (a path or seekable binary file) and check its member count."""
+    try:
+        archive = zipfile.ZipFile(source)
+    except (zipfile.BadZipFile, OSError) as e:
+        raise ZipRejected(f"Not a valid ZIP archive ({e}).")
+    if len(archive.infolist()) > ZIP_MAX_MEMBERS:
+        archive.close()
+        raise ZipRejected(f"Archive has more than {ZIP_MAX_MEMBERS} entries.")
+    return archive
+
+
+def iter_zip_members(archive: zipfile.ZipFile):
+    """Yield a ``ZipMember`` for every file in the archive, in archive order."""
+    for info in archive.infolist():
+        if info.is_dir():
+            continue
+        name = posixpath.basename(info.filename)
+        reason = _skip_reason(info, name)
+        if reason is not None:
+            yield ZipMember(info.filename, None, reason, None)
+            continue
+        try:
+            upload = _read_member(archive, info, name)
+        except NotImplementedError as e:
+            # Deflate64, or LZMA / bzip2 without their codec
+            yield ZipMember(info.filename, None, None, f"unsupported compression: {e}")
+            continue
+        except RuntimeError as e:
+            # zipfile's "encrypted, password required" (flag bit missing from the header)
+            yield ZipMember(info.filename, None, None, f"unreadable member: {e}")
+            continue
+        except (zipfile.BadZipFile, zlib.error, EOFError, ValueError, OSError) as e:
+            yield ZipMember(info.filename, None, None, f"corrupt member: {e}")
+            continue
+        yield ZipMember(info.filename, upload, None, None)
+
+
+def _skip_reason(info: zipfile.ZipInfo, name: str):
+    if info.filename.startswith("__MACOSX/") or name.startswith("."):
+        return "not a resume"
+    if not name.lower().endswith(RESUME_EXTENSIONS):
+        return "not a resume"
+    if info.flag_bits & 0x1:
+        return "encrypted"
+    if info.file_size > ZIP_MAX_MEMBER_BYTES:
+        return f"exceeds {ZIP_MAX_MEMBER_BYTES // (1024 * 1024)}MB limit"
+    if info.file_size > ZIP_MAX_RATIO * max(info.compress_size, 1):
+        return "suspicious compression ratio"
+    return None
+
+
+def archive_fingerprint(fileobj) -> str:
+    """SHA-256 of a seekable archive file, read in chunks; rewinds it."""
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    while True:
+        chunk = fileobj.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def _read_member(archive, info, name) -> UploadedResume:
+    """Read one member into memory, never past ``ZIP_MAX_MEMBER_BYTES``."""
+    digest = hashlib.sha256()
+    buffer = bytearray()
+    with archive.open(info) as fh:
+        while True:
+            chunk = fh.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            buffer += chunk
+            # zipfile stops at the header's size; this guards against lying headers anyway
+            if len(buffer) > ZIP_MAX_MEMBER_BYTES:
+                raise ValueError("larger than its header says")
+            digest.update(chunk)
+    return UploadedResume(name, bytes(buffer), digest.hexdigest())
+
+
+def ingest_zip(archive, jd, jd_data, tracker: BatchTracker, upload_folder: str,
+               slice_size: int = ZIP_SLICE):
+    """
+    Import every resume in ``archive`` as an applicant of ``jd`` (``jd_data``
+    is its ``CompiledJD``) into ``tracker``'s batch.  Yields
+    ``(index, result)`` per member as its slice is committed; skipped
+    members — including ones already imported — have ``skipped=True``;
+    unreadable ones are failed results.
+    """
+    writer = BatchWriter(on_write=tracker.record_written)
+    target = jd_target(jd_data)
+    scorer = lambda batch: calculate_jd_match_score_batch(batch, jd_data)
+    pending = []   # (index, upload) for the current slice
+    seen = set()   # sha256 of every member read so far
+
+    for index, member in enumerate(iter_zip_members(archive)):
+        if member.error is not None:
+            tracker.unreadable += 1
+            yield index, {"candidateName": member.name, "score": 0,
+                          "status": f"Failed ({member.error})", "error": True}
+            continue
+        if member.upload is None:
+            yield index, _skipped(member.name, member.skipped)
+            continue
+        if member.upload.sha256 in seen:
+            yield index, _skipped(member.name, "duplicate in archive")
+            continue
+        seen.add(member.upload.sha256)
+        pending.append((index, member.upload))
+        if len(pending) >= max(1, slice_size):
+            yield from _ingest_slice(writer, tracker, jd, pending, target, scorer, upload_folder)
+            pending = []
+    if pending:
+        yield from _ingest_slice(writer, tracker, jd, pending, target, scorer, upload_folder)
+    tracker.finish()
+
+
+def _ingest_slice(writer, tracker, jd, pending, target, scorer, upload_folder):
+    todo = tracker.admit([upload for _, upload in pending])
+    items = ingest_batch(todo, target, scorer)
+    results = dict(store_applicants(writer, jd, [(item.upload, item) for item in items],
+                                    tracker.batch.user_id, tracker.key, upload_folder))
+    tracker.settle(items, writer)
+    return [(index, results[upload] if upload in results else _skipped(upload.filename, "already imported"))
+            for index, upload in pending]
+
+
+def _skipped(name, reason):
+    return {"candidateName": name, "score": 0, "status": f"Skipped ({reason})", "error": False, "skipped": True}
@@ -129,8 +129,15 @@ function initUploadPage() {
             const data = await response.json();
 
             if (response.ok) {
-                localStorage.setItem('resumeAnalysis', JSON.stringify(data));
-                window.location.href = '/result';
+                // 202: the upload is queued; wait for the worker to score it
+                const job = await waitForUploadJob(data.status_url);
+                if (job.result) {
+                    localStorage.setItem('resumeAnalysis', JSON.stringify(job.result));
+                    window.location.href = '/result';
+                } else {
+                    alert(job.error || 'Analysis failed');
+                    terminal.style.display = 'none';
+                }
             } else {
                 alert(data.error || 'Upload failed');
                 terminal.style.display = 'none';
@@ -143,6 +150,18 @@ function initUploadPage() {
     });
 }
 
+// Poll an upload job (GET /jobs/<id>) until its score is ready or it failed.
+// The AI feedback may still be pending; the result page fetches it later.
+async function waitForUploadJob(statusUrl, interval = 250) {
+    while (true) {
+        const response = await fetch(statusUrl, { cache: 'no-store' });
+        const job = await response.json();
+        if (!response.ok) return { state: 'failed', error: job.error };
+        if (job.result || job.state === 'failed') return job;
+        await new Promise(resolve => setTimeout(resolve, interval));
+    }
+}
+
 function playTerminalAnimation() {
     return new Promise((resolve) => {
         const linesContainer = document.getElementById('terminalLines');
@@ -227,6 +246,11 @@ function initResultPage() {
     renderList('strengthsList', data.suggestions.strengths);
     renderList('improvementsList', [...data.suggestions.weaknesses, ...data.suggestions.improvements]);
 
+    // AI narrative + tips arrive after the score
+    if (data.suggestions.ai_pending && data.resume_id) {
+        pollAiFeedback(data);
+    }
+
     // Animate Score
     animateScore(data.score);
 
@@ -247,6 +271,39 @@ function initResultPage() {
     });
 }
 
+// Fetch the deferred AI feedback for a stored resume and merge it into the page
+async function pollAiFeedback(data, interval = 1500, attempts = 80) {
+    for (let i = 0; i < attempts; i++) {
+        await new Promise(resolve => setTimeout(resolve, interval));
+        let ai;
+        try {
+            const response = await fetch(`/report/${data.resume_id}/ai`, { cache: 'no-store' });
+            if (!response.ok) return;
+            ai = await response.json();
+        } catch (error) {
+            continue;
+        }
+        if (ai.pending) continue;
+
+        Object.assign(data.suggestions, {
+            improvements: ai.improvements,
+            ai_narrative: ai.ai_narrative,
+            ai_powered: ai.ai_powered,
+            ai_pending: false,
+        });
+        if (!window.serverData) {
+            localStorage.setItem('resumeAnalysis', JSON.stringify(data));
+        }
+        renderList('improvementsList', [...data.suggestions.weaknesses, ...data.suggestions.improvements]);
+        if (ai.ai_powered && ai.ai_narrative) {
+            document.getElementById('aiNarrativeText').textContent = ai.ai_narrative;
+            document.getElementById('aiNarrativeCard').style.display = 'block';
+            document.getElementById('staticTipCard').style.display = 'none';
+        }
+        return;
+    }
+}
+
 function getScoreMessage(score) {
     if (score >= 80) return "Excellent! Ready for applications.";
     if (score >= 60) return "Good, but needs optimization.";